@@ -0,0 +1,3 @@
+#!/usr/bin/env bash
+
+python3 bench/run.py "$@"
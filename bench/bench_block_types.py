@@ -0,0 +1,88 @@
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from block_markdown import BlockType, block_to_block_type  # noqa: E402
+
+
+def legacy_block_to_block_type(block: str) -> str:
+    lines = block.split("\n")
+    block_types_re = {
+        "heading": re.compile(r"^#{1,6}\s.*$", re.MULTILINE),
+        "code": re.compile(r"^`{3}\n.*\n`{3}", re.MULTILINE),
+        "quote": re.compile(r"^>\s?.*$", re.MULTILINE),
+        "unordered_list": re.compile(r"^[\*-]\s.*$", re.MULTILINE),
+        "ordered_list": re.compile(r"^1\.\s.*$", re.MULTILINE),
+    }
+    for block_type, pattern in block_types_re.items():
+        if pattern.match(block):
+            match block_type:
+                case "heading":
+                    return BlockType.heading.name
+                case "code":
+                    if len(lines) > 1:
+                        return BlockType.code.name
+                case "quote":
+                    for line in lines:
+                        if not line.startswith(">"):
+                            return BlockType.paragraph.name
+                    return BlockType.quote.name
+                case "unordered_list":
+                    for line in lines:
+                        if not pattern.match(line):
+                            return BlockType.paragraph.name
+                    return BlockType.unordered_list.name
+                case "ordered_list":
+                    i = 1
+                    for line in lines:
+                        if not line.startswith(f"{i}. "):
+                            return BlockType.paragraph.name
+                        i += 1
+                    return BlockType.ordered_list.name
+    return BlockType.paragraph.name
+
+
+def make_block(rng: random.Random) -> str:
+    words = " ".join(rng.choice(["lorem", "ipsum", "**dolor**", "sit"]) for _ in range(12))
+    size = rng.randint(1, 8)
+    kind = rng.randrange(7)
+    if kind == 0:
+        return "#" * rng.randint(1, 7) + " " + words
+    if kind == 1:
+        return "```\n" + words + "\n```"
+    if kind == 2:
+        return "\n".join("> " + words for _ in range(size))
+    if kind == 3:
+        return "\n".join(rng.choice("*-") + " " + words for _ in range(size))
+    if kind == 4:
+        return "\n".join(f"{i}. {words}" for i in range(1, size + 1))
+    if kind == 5:
+        lines = [rng.choice("*-") + " " + words for _ in range(size)]
+        lines[-1] = words
+        return "\n".join(lines)
+    return "\n".join(words for _ in range(size))
+
+
+def main():
+    rng = random.Random(42)
+    blocks = [make_block(rng) for _ in range(20000)]
+    for block in blocks:
+        expected = legacy_block_to_block_type(block)
+        if block_to_block_type(block) != expected:
+            raise AssertionError(f"classification changed for {block!r}")
+    for name, classify in (
+        ("legacy", legacy_block_to_block_type),
+        ("current", block_to_block_type),
+    ):
+        seconds = min(
+            timeit.repeat(lambda: [classify(b) for b in blocks], number=1, repeat=5)
+        )
+        print(f"{name:>8}: {seconds / len(blocks) * 1e9:8.0f} ns/block")
+
+
+if __name__ == "__main__":
+    main()
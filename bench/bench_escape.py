@@ -0,0 +1,73 @@
+import os
+import sys
+import timeit
+from contextlib import contextmanager
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import block_markdown  # noqa: E402
+import htmlnode  # noqa: E402
+import textnode  # noqa: E402
+from block_markdown import markdown_to_html  # noqa: E402
+from corpus import CorpusGenerator  # noqa: E402
+
+CORPORA = {
+    "prose": {"paragraph": 6, "heading": 2, "unordered_list": 1},
+    "default": None,
+    "code-heavy": {"code": 6, "paragraph": 1, "heading": 1},
+}
+
+
+# Every module that imported the escaping functions by name, so code blocks
+# and the tree serializer lose their escaping too.
+ESCAPING_MODULES = (htmlnode, textnode, block_markdown)
+ESCAPE_FUNCTIONS = ("escape_text", "escape_attribute")
+
+
+@contextmanager
+def escaping_disabled():
+    saved = []
+    for module in ESCAPING_MODULES:
+        for name in ESCAPE_FUNCTIONS:
+            if hasattr(module, name):
+                saved.append((module, name, getattr(module, name)))
+                setattr(module, name, lambda text: text)
+    try:
+        yield
+    finally:
+        for module, name, function in saved:
+            setattr(module, name, function)
+
+
+def time_render(pages, repeat: int = 20) -> Tuple[float, float]:
+    # Raw and escaped runs alternate, so drift in machine load affects both.
+    def render():
+        for page in pages:
+            markdown_to_html(page)
+
+    raw: List[float] = []
+    escaped: List[float] = []
+    for _ in range(repeat):
+        with escaping_disabled():
+            raw.append(timeit.timeit(render, number=1))
+        escaped.append(timeit.timeit(render, number=1))
+    return min(raw) / len(pages), min(escaped) / len(pages)
+
+
+def main():
+    for name, block_mix in CORPORA.items():
+        if block_mix is None:
+            generator = CorpusGenerator(pages=100)
+        else:
+            generator = CorpusGenerator(pages=100, block_mix=block_mix)
+        pages = [generator.page(i) for i in range(generator.pages)]
+        raw, escaped = time_render(pages)
+        print(
+            f"{name:>12}: {raw * 1e6:8.1f} us/page raw, "
+            f"{escaped * 1e6:8.1f} us/page escaped ({escaped / raw - 1:+.1%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import gc
+import os
+import resource
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from block_markdown import markdown_to_html, markdown_to_html_node  # noqa: E402
+from htmlnode import LeafNode  # noqa: E402
+from textnode import TextNode, TextType  # noqa: E402
+
+
+class DictLeafNode:
+    def __init__(self, tag, value, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
+
+
+class DictTextNode:
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+def bytes_per_node(factory, count: int = 100000) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    list_bytes = sys.getsizeof(nodes)
+    del nodes
+    return (after - before - list_bytes) / count
+
+
+def allocations(render, markdown: str):
+    leaves = 0
+    leaf_init = LeafNode.__init__
+
+    def counting_init(self, *args, **kwargs):
+        nonlocal leaves
+        leaves += 1
+        leaf_init(self, *args, **kwargs)
+
+    LeafNode.__init__ = counting_init
+    gc.collect()
+    tracemalloc.start()
+    try:
+        render(markdown)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        LeafNode.__init__ = leaf_init
+    return leaves, peak
+
+
+def make_document(sections: int) -> str:
+    section = (
+        "## Section heading\n\n"
+        "A paragraph with **bold**, *italic*, `code` and a [link](/somewhere).\n\n"
+        "* first item\n* second *item*\n* third item\n\n"
+        "> a quote\n> over two lines\n\n"
+    )
+    return "# Large document\n\n" + section * sections
+
+
+def main():
+    text = "fragment"
+    cases = [
+        ("LeafNode (__dict__)", lambda i: DictLeafNode(None, text)),
+        ("LeafNode (__slots__)", lambda i: LeafNode(None, text)),
+        ("TextNode (__dict__)", lambda i: DictTextNode(text, TextType.text.name)),
+        ("TextNode (__slots__)", lambda i: TextNode(text, TextType.text.name)),
+    ]
+    for name, factory in cases:
+        print(f"{name:>22}: {bytes_per_node(factory):6.1f} bytes/node")
+    markdown = make_document(2000)
+    renderers = [
+        ("tree + to_html", lambda md: markdown_to_html_node(md).to_html()),
+        ("markdown_to_html", markdown_to_html),
+    ]
+    for name, render in renderers:
+        leaves, peak = allocations(render, markdown)
+        print(f"{name:>22}: {leaves:7d} LeafNodes, peak {peak / 1e6:6.1f} MB traced")
+    markdown = make_document(20000)
+    html_node = markdown_to_html_node(markdown)
+    html_node.to_html()
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_rss //= 1024
+    print(f"peak RSS rendering {len(markdown) / 1e6:.1f} MB: {peak_rss / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import os
+import random
+import shutil
+from typing import Dict, List
+
+DEFAULT_BLOCK_MIX = {
+    "paragraph": 6,
+    "heading": 2,
+    "code": 1,
+    "quote": 1,
+    "unordered_list": 1,
+    "ordered_list": 1,
+}
+
+WORDS = [
+    "middle",
+    "earth",
+    "ring",
+    "fellowship",
+    "shire",
+    "wizard",
+    "river",
+    "mountain",
+    "journey",
+    "ancient",
+    "kingdom",
+    "lore",
+]
+
+
+def parse_block_mix(text: str) -> Dict[str, int]:
+    mix: Dict[str, int] = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in DEFAULT_BLOCK_MIX:
+            raise ValueError(f"Unknown block type: {name}")
+        mix[name.strip()] = int(weight)
+    return mix
+
+
+class CorpusGenerator:
+    def __init__(
+        self,
+        pages: int = 200,
+        depth: int = 2,
+        blocks_per_page: int = 30,
+        block_mix: Dict[str, int] = DEFAULT_BLOCK_MIX,
+        link_density: float = 0.1,
+        code_lines: int = 8,
+        seed: int = 0,
+    ):
+        self.pages = pages
+        self.depth = depth
+        self.blocks_per_page = blocks_per_page
+        self.block_mix = block_mix
+        self.link_density = link_density
+        self.code_lines = code_lines
+        self.rng = random.Random(seed)
+        self.paths = [self.page_path(i) for i in range(pages)]
+
+    def page_path(self, index: int) -> str:
+        parts = [f"section-{(index >> (3 * level)) % 8}" for level in range(self.depth)]
+        return "/".join(parts + [f"page-{index}"])
+
+    def words(self, count: int) -> str:
+        words: List[str] = []
+        for _ in range(count):
+            roll = self.rng.random()
+            if roll < self.link_density:
+                target = self.rng.choice(self.paths)
+                words.append(f"[{self.rng.choice(WORDS)}](/{target})")
+            elif roll < self.link_density + 0.05:
+                words.append(f"**{self.rng.choice(WORDS)}**")
+            elif roll < self.link_density + 0.1:
+                words.append(f"*{self.rng.choice(WORDS)}*")
+            elif roll < self.link_density + 0.12:
+                words.append(f"`{self.rng.choice(WORDS)}`")
+            else:
+                words.append(self.rng.choice(WORDS))
+        return " ".join(words)
+
+    def block(self, kind: str) -> str:
+        if kind == "heading":
+            return "#" * self.rng.randint(2, 4) + " " + self.words(4)
+        if kind == "code":
+            # The parser only treats a fence around a single line as a code
+            # block, so code_lines statements share that line.
+            statements = [
+                f"value_{i} = compute(value_{i - 1} < {self.rng.randint(0, 99)} && ok)"
+                for i in range(self.code_lines)
+            ]
+            return "```\n" + "; ".join(statements) + "\n```"
+        if kind == "quote":
+            return "\n".join("> " + self.words(10) for _ in range(3))
+        if kind == "unordered_list":
+            return "\n".join("- " + self.words(8) for _ in range(4))
+        if kind == "ordered_list":
+            return "\n".join(f"{i}. {self.words(8)}" for i in range(1, 5))
+        return "\n".join(self.words(16) for _ in range(3))
+
+    def page(self, index: int) -> str:
+        kinds = list(self.block_mix)
+        weights = [self.block_mix[kind] for kind in kinds]
+        blocks = [f"# Page {index}: {self.words(3)}"]
+        for kind in self.rng.choices(kinds, weights, k=self.blocks_per_page):
+            blocks.append(self.block(kind))
+        return "\n\n".join(blocks) + "\n"
+
+    def write(self, root: str) -> List[str]:
+        if os.path.exists(root):
+            shutil.rmtree(root)
+        files: List[str] = []
+        for index, path in enumerate(self.paths):
+            file_path = os.path.join(root, *path.split("/")) + ".md"
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, "w") as file:
+                file.write(self.page(index))
+            files.append(file_path)
+        return files
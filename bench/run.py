@@ -0,0 +1,182 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import timeit
+from typing import Callable, Dict
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from ast_cache import parse_document  # noqa: E402
+from block_markdown import (  # noqa: E402
+    blocks_to_html_fragments,
+    ir_to_html,
+    markdown_to_blocks,
+    markdown_to_html,
+    markdown_to_html_node,
+)
+from corpus import CorpusGenerator, DEFAULT_BLOCK_MIX, parse_block_mix  # noqa: E402
+from inline_markdown import text_to_textnodes  # noqa: E402
+import main as site_main  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(ROOT, "bench", "baseline.json")
+
+
+def best_of(func: Callable, repeat: int, number: int = 1) -> float:
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def bench_full_build(generator: CorpusGenerator, repeat: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        generator.write(os.path.join(tmp, "content"))
+        shutil.copytree(os.path.join(ROOT, "static"), os.path.join(tmp, "static"))
+        shutil.copy(os.path.join(ROOT, "template.html"), tmp)
+        cwd = os.getcwd()
+        argv = sys.argv
+        os.chdir(tmp)
+        sys.argv = ["main.py"]
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                return best_of(site_main.main, repeat)
+        finally:
+            os.chdir(cwd)
+            sys.argv = argv
+
+
+def run_benchmarks(generator: CorpusGenerator, repeat: int) -> Dict[str, float]:
+    page = generator.page(0)
+    paragraph = max(markdown_to_blocks(page), key=len).replace("\n", " ")
+    tree = markdown_to_html_node(page)
+    document = json.dumps(parse_document(page))
+
+    def render_cached() -> str:
+        body = json.loads(document)["body"]
+        return "".join(blocks_to_html_fragments(body, ir_to_html))
+
+    return {
+        "full_build": bench_full_build(generator, repeat),
+        "markdown_to_html_node": best_of(
+            lambda: markdown_to_html_node(page), repeat, 20
+        ),
+        "text_to_textnodes": best_of(lambda: text_to_textnodes(paragraph), repeat, 200),
+        "to_html": best_of(tree.to_html, repeat, 20),
+        "markdown_to_html": best_of(lambda: markdown_to_html(page), repeat, 20),
+        "ast_cache_to_html": best_of(render_cached, repeat, 20),
+    }
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float):
+    regressions = []
+    print(f"{'benchmark':<24}{'baseline':>14}{'current':>14}{'change':>10}")
+    for name, seconds in results.items():
+        if name not in baseline:
+            print(f"{name:<24}{'-':>14}{seconds * 1000:>11.3f} ms{'new':>10}")
+            continue
+        change = seconds / baseline[name] - 1
+        marker = " !" if change > threshold else ""
+        print(
+            f"{name:<24}{baseline[name] * 1000:>11.3f} ms"
+            f"{seconds * 1000:>11.3f} ms{change:>+9.1%}{marker}"
+        )
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the site generator")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--blocks-per-page", type=int, default=30)
+    parser.add_argument(
+        "--block-mix",
+        type=parse_block_mix,
+        default=DEFAULT_BLOCK_MIX,
+        help="weights such as paragraph=6,code=1,heading=2",
+    )
+    parser.add_argument("--link-density", type=float, default=0.1)
+    parser.add_argument(
+        "--code-lines",
+        type=int,
+        default=8,
+        help="statements per code block, all on the fence's single line",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store these results as the new baseline",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="slowdown ratio reported as a regression",
+    )
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="exit with status 1 when a benchmark regresses",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    generator = CorpusGenerator(
+        pages=args.pages,
+        depth=args.depth,
+        blocks_per_page=args.blocks_per_page,
+        block_mix=args.block_mix,
+        link_density=args.link_density,
+        code_lines=args.code_lines,
+        seed=args.seed,
+    )
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "params": {
+            "pages": args.pages,
+            "depth": args.depth,
+            "blocks_per_page": args.blocks_per_page,
+            "block_mix": args.block_mix,
+            "link_density": args.link_density,
+            "code_lines": args.code_lines,
+            "seed": args.seed,
+        },
+        "results": run_benchmarks(generator, args.repeat),
+    }
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline["params"] != report["params"]:
+            print("Warning: baseline was recorded with different corpus parameters")
+        regressions = compare(report["results"], baseline["results"], args.threshold)
+    else:
+        for name, seconds in report["results"].items():
+            print(f"{name:<24}{seconds * 1000:>11.3f} ms")
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=1)
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(report, file, indent=1)
+        print(f"Saved baseline to {args.baseline}")
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
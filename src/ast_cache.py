@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+from block_markdown import block_to_ir
+from deps import DependencyCollector
+from metadata import parse_page
+
+# Bump whenever parsing changes so stale trees are never served. Serializer
+# changes (escaping, image attributes, the template) need no bump: they
+# apply when the cached tree is turned into HTML.
+PARSER_VERSION = 4
+
+
+def source_key(markdown: str) -> str:
+    return hashlib.sha1(markdown.encode()).hexdigest()
+
+
+def parse_document(markdown: str, terms: bool = False) -> Dict:
+    metadata, blocks = parse_page(markdown)
+    collector = DependencyCollector(terms)
+    return {
+        "meta": metadata,
+        "body": [block_to_ir(block, collector.add_nodes) for block in blocks],
+        **collector.result(),
+    }
+
+
+class AstCache:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.pending: List[Tuple[str, int, str]] = []
+        self.hits = 0
+        self.misses = 0
+        self.db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self.db = self.open_db(path)
+
+    def open_db(self, path: str) -> sqlite3.Connection:
+        dir_path = os.path.dirname(path)
+        if dir_path != "":
+            os.makedirs(dir_path, exist_ok=True)
+        try:
+            return self.connect(path)
+        except sqlite3.DatabaseError:
+            os.remove(path)
+            return self.connect(path)
+
+    def connect(self, path: str) -> sqlite3.Connection:
+        # The single-worker async pipeline parses on an executor thread.
+        db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=OFF")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS documents "
+            "(key TEXT PRIMARY KEY, version INTEGER, document TEXT)"
+        )
+        db.execute("DELETE FROM documents WHERE version != ?", (PARSER_VERSION,))
+        db.commit()
+        return db
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        if self.db is None:
+            return None
+        row = self.db.execute(
+            "SELECT document FROM documents WHERE key = ? AND version = ?",
+            (key, PARSER_VERSION),
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def parse(self, markdown: str, terms: bool = False) -> Dict:
+        key = source_key(markdown)
+        document = self.lookup(key)
+        if document is not None and (not terms or "terms" in document):
+            self.hits += 1
+        else:
+            document = parse_document(markdown, terms)
+            self.misses += 1
+            if self.db is not None:
+                data = json.dumps(document, separators=(",", ":"))
+                self.pending.append((key, PARSER_VERSION, data))
+        return document
+
+    def flush(self) -> None:
+        if self.db is None or not self.pending:
+            return
+        self.db.executemany(
+            "INSERT OR REPLACE INTO documents (key, version, document) "
+            "VALUES (?, ?, ?)",
+            self.pending,
+        )
+        self.db.commit()
+        self.pending = []
+
+    def close(self) -> None:
+        self.flush()
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def __repr__(self):
+        return f"AstCache({self.path})"
+
+
+_cache: Optional[AstCache] = None
+
+
+def configure_ast_cache(path: Optional[str]) -> Optional[AstCache]:
+    global _cache
+    if _cache is not None:
+        _cache.close()
+    _cache = AstCache(path) if path is not None else None
+    return _cache
+
+
+def active_ast_cache() -> Optional[AstCache]:
+    return _cache
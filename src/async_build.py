@@ -0,0 +1,178 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import utils
+from template import load_template
+from writer import active_output_writer
+
+Job = Tuple[int, str, str]
+
+
+def render_markdown(markdown: str, template_file: str) -> Tuple[str, Dict]:
+    page, result = utils.render_page(markdown, load_template(template_file))
+    utils.flush_caches()
+    return page, result
+
+
+def render_large_source(
+    source_file: str, template_file: str, dest_file: str
+) -> Dict:
+    return utils.generate_page_streaming(source_file, template_file, dest_file)
+
+
+def read_file(path: str) -> str:
+    with open(path, "r") as file:
+        return file.read()
+
+
+class AsyncPipeline:
+    def __init__(
+        self,
+        pages: List[Tuple[str, str]],
+        template_file: str,
+        render_executor: Executor,
+        io_concurrency: int,
+        queue_size: int,
+    ):
+        # Bounded queues keep reads from prefetching more than queue_size
+        # pages ahead of rendering, and rendering ahead of writing.
+        self.pages = pages
+        self.template_file = template_file
+        self.render_executor = render_executor
+        self.io_concurrency = io_concurrency
+        self.read_queue: "asyncio.Queue[Optional[Job]]" = asyncio.Queue()
+        self.render_queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.write_queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.deps: Dict[str, Dict] = {}
+        self.errors: Dict[int, str] = {}
+        self.done: List[bool] = [False] * len(pages)
+        self.next_report = 0
+
+    def report(self, index: int) -> None:
+        self.done[index] = True
+        while self.next_report < len(self.pages) and self.done[self.next_report]:
+            source_file, dest_file = self.pages[self.next_report]
+            if self.next_report not in self.errors:
+                print(
+                    f"Generating page from {source_file} to {dest_file} "
+                    f"using {self.template_file}"
+                )
+            self.next_report += 1
+
+    def fail(self, index: int, error: Exception) -> None:
+        source_file = self.pages[index][0]
+        self.errors[index] = f"{source_file}: {type(error).__name__}: {error}"
+        self.report(index)
+
+    async def reader(self) -> None:
+        while True:
+            job = await self.read_queue.get()
+            if job is None:
+                return
+            index, source_file, dest_file = job
+            try:
+                if os.path.getsize(source_file) >= utils.STREAM_THRESHOLD:
+                    markdown = None
+                else:
+                    markdown = await asyncio.to_thread(read_file, source_file)
+            except Exception as e:
+                self.fail(index, e)
+                continue
+            await self.render_queue.put((index, source_file, dest_file, markdown))
+
+    async def renderer(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self.render_queue.get()
+            if item is None:
+                return
+            index, source_file, dest_file, markdown = item
+            try:
+                if markdown is None:
+                    self.deps[source_file] = await loop.run_in_executor(
+                        self.render_executor,
+                        render_large_source,
+                        source_file,
+                        self.template_file,
+                        dest_file,
+                    )
+                    if isinstance(self.render_executor, ProcessPoolExecutor):
+                        # The worker wrote the page with its own writer.
+                        active_output_writer().note(dest_file)
+                    self.report(index)
+                    continue
+                page, deps = await loop.run_in_executor(
+                    self.render_executor,
+                    render_markdown,
+                    markdown,
+                    self.template_file,
+                )
+            except Exception as e:
+                self.fail(index, e)
+                continue
+            self.deps[source_file] = deps
+            await self.write_queue.put((index, dest_file, page))
+
+    async def writer(self) -> None:
+        while True:
+            item = await self.write_queue.get()
+            if item is None:
+                return
+            index, dest_file, page = item
+            try:
+                await asyncio.to_thread(utils.write_page, dest_file, page)
+            except Exception as e:
+                self.fail(index, e)
+                continue
+            self.report(index)
+
+    async def run(self, render_tasks: int) -> Dict[str, Dict]:
+        for index, (source_file, dest_file) in enumerate(self.pages):
+            self.read_queue.put_nowait((index, source_file, dest_file))
+        readers = [
+            asyncio.create_task(self.reader()) for _ in range(self.io_concurrency)
+        ]
+        renderers = [
+            asyncio.create_task(self.renderer()) for _ in range(render_tasks)
+        ]
+        writers = [
+            asyncio.create_task(self.writer()) for _ in range(self.io_concurrency)
+        ]
+        for _ in readers:
+            self.read_queue.put_nowait(None)
+        await asyncio.gather(*readers)
+        for _ in renderers:
+            await self.render_queue.put(None)
+        await asyncio.gather(*renderers)
+        for _ in writers:
+            await self.write_queue.put(None)
+        await asyncio.gather(*writers)
+        return self.deps
+
+
+def generate_pages_async(
+    pages: List[Tuple[str, str]],
+    template_file: str,
+    workers: int = 1,
+    io_concurrency: int = 16,
+    queue_size: Optional[int] = None,
+) -> Dict[str, Dict]:
+    if queue_size is None:
+        queue_size = max(4, workers * 4)
+    if workers > 1:
+        executor: Executor = ProcessPoolExecutor(
+            max_workers=workers, **utils.worker_pool_kwargs(template_file)
+        )
+    else:
+        executor = ThreadPoolExecutor(max_workers=1)
+    with executor:
+        pipeline = AsyncPipeline(
+            pages, template_file, executor, io_concurrency, queue_size
+        )
+        deps = asyncio.run(pipeline.run(render_tasks=workers * 2))
+    if pipeline.errors:
+        for index in sorted(pipeline.errors):
+            print(f"Error: {pipeline.errors[index]}")
+        raise Exception(f"{len(pipeline.errors)} page(s) failed to render")
+    return deps
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import sqlite3
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import textnode
+from block_markdown import block_to_html
+from deps import DependencyCollector
+
+# Bump whenever block rendering changes so stale HTML is never served.
+CACHE_VERSION = 5
+
+Entry = Tuple[str, Dict]
+
+
+def block_key(block: str) -> str:
+    # Blocks with images also depend on the attributes the image pipeline
+    # attached to them.
+    if textnode.IMAGE_ATTRIBUTES_DIGEST and "![" in block:
+        block = textnode.IMAGE_ATTRIBUTES_DIGEST + block
+    return hashlib.sha1(block.encode()).hexdigest()
+
+
+class BlockCache:
+    def __init__(self, max_entries: int = 4096, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.path = path
+        # Each block keeps what the renderer collected from its TextNodes, so
+        # a hit can hand it to the page without parsing the block again.
+        self.entries: "OrderedDict[str, Entry]" = OrderedDict()
+        self.pending: List[Tuple[str, int, str, str]] = []
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self.db = self.open_db(path)
+
+    def open_db(self, path: str) -> sqlite3.Connection:
+        dir_path = os.path.dirname(path)
+        if dir_path != "":
+            os.makedirs(dir_path, exist_ok=True)
+        try:
+            return self.connect(path)
+        except sqlite3.DatabaseError:
+            os.remove(path)
+            return self.connect(path)
+
+    def connect(self, path: str) -> sqlite3.Connection:
+        # The single-worker async pipeline renders on an executor thread.
+        db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=OFF")
+        columns = [row[1] for row in db.execute("PRAGMA table_info(blocks)")]
+        if columns and "summary" not in columns:
+            db.execute("DROP TABLE blocks")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS blocks "
+            "(key TEXT PRIMARY KEY, version INTEGER, html TEXT, summary TEXT)"
+        )
+        db.execute("DELETE FROM blocks WHERE version != ?", (CACHE_VERSION,))
+        db.commit()
+        return db
+
+    def remember(self, key: str, entry: Entry) -> None:
+        self.entries[key] = entry
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def lookup(self, key: str) -> Optional[Entry]:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        if self.db is None:
+            return None
+        row = self.db.execute(
+            "SELECT html, summary FROM blocks WHERE key = ? AND version = ?",
+            (key, CACHE_VERSION),
+        ).fetchone()
+        if row is None:
+            return None
+        entry = (row[0], json.loads(row[1]))
+        self.remember(key, entry)
+        self.disk_hits += 1
+        return entry
+
+    def render(
+        self, block: str, collector: Optional[DependencyCollector] = None
+    ) -> str:
+        key = block_key(block)
+        entry = self.lookup(key)
+        if entry is None:
+            # Terms are always kept, so a build with search enabled can reuse
+            # blocks cached by one without.
+            block_collector = DependencyCollector(terms=True)
+            html = block_to_html(block, block_collector.add_nodes)
+            entry = (html, block_collector.result())
+            self.remember(key, entry)
+            if self.db is not None:
+                summary = json.dumps(entry[1], separators=(",", ":"))
+                self.pending.append((key, CACHE_VERSION, html, summary))
+            self.misses += 1
+        if collector is not None:
+            collector.add_result(entry[1])
+        return entry[0]
+
+    def flush(self) -> None:
+        if self.db is None or not self.pending:
+            return
+        self.db.executemany(
+            "INSERT OR REPLACE INTO blocks (key, version, html, summary) "
+            "VALUES (?, ?, ?, ?)",
+            self.pending,
+        )
+        self.db.commit()
+        self.pending = []
+
+    def close(self) -> None:
+        self.flush()
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses}
+
+    def __repr__(self):
+        return f"BlockCache({len(self.entries)}/{self.max_entries}, {self.path})"
+
+
+_cache: Optional[BlockCache] = None
+
+
+def configure_block_cache(
+    max_entries: int, path: Optional[str] = None
+) -> Optional[BlockCache]:
+    global _cache
+    if _cache is not None:
+        _cache.close()
+    _cache = BlockCache(max_entries, path) if max_entries > 0 else None
+    return _cache
+
+
+def active_block_cache() -> Optional[BlockCache]:
+    return _cache
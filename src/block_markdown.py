@@ -1,22 +1,43 @@
 import re
 from enum import Enum
-from typing import List
-from htmlnode import HTMLNode, LeafNode, ParentNode
-from textnode import text_node_to_html_node
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
+from htmlnode import HTMLNode, LeafNode, ParentNode, escape_text
+from textnode import TextNode, TextType, text_node_to_html, text_node_to_html_node
 from inline_markdown import text_to_textnodes
 
+# Compact, JSON-friendly form of a parsed block: elements are [tag, children]
+# and inline text is [text, text_type] or [text, text_type, url], so it can be
+# serialized without reparsing the markdown.
+IRNode = List[Union[str, list]]
+# Receives the TextNodes of every inline run as a block is rendered, so
+# callers can collect links and the like without parsing the text again.
+NodeCallback = Optional[Callable[[List[TextNode]], None]]
+TEXT = TextType.text.name
+INLINE_TAGS = {
+    TextType.bold.name: "b",
+    TextType.italic.name: "i",
+    TextType.code.name: "code",
+}
+
 BlockType = Enum(
     "BlockType",
     ["paragraph", "heading", "code", "quote", "unordered_list", "ordered_list"],
 )
 
+HEADING_RE = re.compile(r"#{1,6}\s")
+CODE_RE = re.compile(r"`{3}\n.*\n`{3}")
+TITLE_RE = re.compile(r"#[^\S\n]")
+UNORDERED_LIST_RE = re.compile(r"[\*-][^\S\n].*(?:\n[\*-][^\S\n].*)*")
+
 
 def extract_title(markdown: str) -> str:
-    lines = markdown.split("\n")
-    title_re = re.compile(r"^#{1}\s.*$", re.MULTILINE)
+    return extract_title_from_lines(markdown.split("\n"))
+
+
+def extract_title_from_lines(lines: Iterable[str]) -> str:
     for line in lines:
-        if title_re.match(line):
-            return line.lstrip("# ")
+        if TITLE_RE.match(line):
+            return line.rstrip("\n").lstrip("# ")
     raise Exception("No title found")
 
 
@@ -26,43 +47,69 @@ def markdown_to_blocks(markdown: str) -> List[str]:
     )
 
 
-def block_to_block_type(block: str) -> str:
-    lines = block.split("\n")
-    block_types_re = {
-        "heading": re.compile(r"^#{1,6}\s.*$", re.MULTILINE),
-        "code": re.compile(r"^`{3}\n.*\n`{3}", re.MULTILINE),
-        "quote": re.compile(r"^>\s?.*$", re.MULTILINE),
-        "unordered_list": re.compile(r"^[\*-]\s.*$", re.MULTILINE),
-        "ordered_list": re.compile(r"^1\.\s.*$", re.MULTILINE),
-    }
-    for block_type, pattern in block_types_re.items():
-        if pattern.match(block):
-            match block_type:
-                case "heading":
-                    return BlockType.heading.name
-                case "code":
-                    if len(lines) > 1:
-                        return BlockType.code.name
-                case "quote":
-                    for line in lines:
-                        if not line.startswith(">"):
-                            return BlockType.paragraph.name
-                    return BlockType.quote.name
-                case "unordered_list":
-                    for line in lines:
-                        if not pattern.match(line):
-                            return BlockType.paragraph.name
-                    return BlockType.unordered_list.name
-                case "ordered_list":
-                    i = 1
-                    for line in lines:
-                        if not line.startswith(f"{i}. "):
-                            return BlockType.paragraph.name
-                        i += 1
-                    return BlockType.ordered_list.name
+def iter_markdown_blocks(lines: Iterable[str]) -> Iterator[str]:
+    block_lines: List[str] = []
+    for line in lines:
+        if line == "\n":
+            block = "".join(block_lines).strip()
+            block_lines = []
+            if block:
+                yield block
+        else:
+            block_lines.append(line)
+    block = "".join(block_lines).strip()
+    if block:
+        yield block
+
+
+def classify_heading(block: str) -> str:
+    if HEADING_RE.match(block):
+        return BlockType.heading.name
+    return BlockType.paragraph.name
+
+
+def classify_code(block: str) -> str:
+    if CODE_RE.match(block):
+        return BlockType.code.name
     return BlockType.paragraph.name
 
 
+def classify_quote(block: str) -> str:
+    if block.count("\n") != block.count("\n>"):
+        return BlockType.paragraph.name
+    return BlockType.quote.name
+
+
+def classify_unordered_list(block: str) -> str:
+    if UNORDERED_LIST_RE.fullmatch(block):
+        return BlockType.unordered_list.name
+    return BlockType.paragraph.name
+
+
+def classify_ordered_list(block: str) -> str:
+    for i, line in enumerate(block.split("\n"), 1):
+        if not line.startswith(f"{i}. "):
+            return BlockType.paragraph.name
+    return BlockType.ordered_list.name
+
+
+BLOCK_CLASSIFIERS = {
+    "#": classify_heading,
+    "`": classify_code,
+    ">": classify_quote,
+    "*": classify_unordered_list,
+    "-": classify_unordered_list,
+    "1": classify_ordered_list,
+}
+
+
+def block_to_block_type(block: str) -> str:
+    classifier = BLOCK_CLASSIFIERS.get(block[:1])
+    if classifier is None:
+        return BlockType.paragraph.name
+    return classifier(block)
+
+
 def markdown_to_html_node(markdown: str) -> HTMLNode:
     blocks = markdown_to_blocks(markdown)
     children_list: List[ParentNode] = []
@@ -72,6 +119,82 @@ def markdown_to_html_node(markdown: str) -> HTMLNode:
     return ParentNode("div", children_list)
 
 
+def markdown_to_html_fragments(
+    markdown: str, render_block: Callable[[str], str]
+) -> Iterator[str]:
+    return blocks_to_html_fragments(markdown_to_blocks(markdown), render_block)
+
+
+def blocks_to_html_fragments(
+    blocks: Iterable[str], render_block: Callable[[str], str]
+) -> Iterator[str]:
+    yield "<div>"
+    for block in blocks:
+        yield render_block(block)
+    yield "</div>"
+
+
+def markdown_to_html(markdown: str) -> str:
+    return "".join(markdown_to_html_fragments(markdown, block_to_html))
+
+
+def block_to_html(block: str, on_nodes: NodeCallback = None) -> str:
+    # Same output as block_to_html_node(block).to_html(), built straight
+    # from the TextNode stream without an intermediate node tree.
+    block_type = block_to_block_type(block)
+    match block_type:
+        case BlockType.paragraph.name:
+            return f"<p>{text_to_html(paragraph_text(block), on_nodes)}</p>"
+        case BlockType.heading.name:
+            level, text = heading_parts(block)
+            return f"<h{level}>{text_to_html(text, on_nodes)}</h{level}>"
+        case BlockType.code.name:
+            return f"<pre><code>{escape_text(code_text(block))}</code></pre>"
+        case BlockType.quote.name:
+            quote = text_to_html(quote_text(block), on_nodes)
+            return f"<blockquote>{quote}</blockquote>"
+        case BlockType.unordered_list.name:
+            return f"<ul>{list_items_to_html(list_items(block, 2), on_nodes)}</ul>"
+        case BlockType.ordered_list.name:
+            return f"<ol>{list_items_to_html(list_items(block, 3), on_nodes)}</ol>"
+        case _:
+            raise ValueError("Invalid block type")
+
+
+def block_to_ir(block: str, on_nodes: NodeCallback = None) -> IRNode:
+    block_type = block_to_block_type(block)
+    match block_type:
+        case BlockType.paragraph.name:
+            return ["p", text_to_ir(paragraph_text(block), on_nodes)]
+        case BlockType.heading.name:
+            level, text = heading_parts(block)
+            return [f"h{level}", text_to_ir(text, on_nodes)]
+        case BlockType.code.name:
+            return ["pre", [["code", [[code_text(block), TEXT]]]]]
+        case BlockType.quote.name:
+            return ["blockquote", text_to_ir(quote_text(block), on_nodes)]
+        case BlockType.unordered_list.name:
+            items = list_items(block, 2)
+            return ["ul", [["li", text_to_ir(item, on_nodes)] for item in items]]
+        case BlockType.ordered_list.name:
+            items = list_items(block, 3)
+            return ["ol", [["li", text_to_ir(item, on_nodes)] for item in items]]
+        case _:
+            raise ValueError("Invalid block type")
+
+
+def ir_to_html(node: IRNode) -> str:
+    if isinstance(node[1], list):
+        children = "".join(map(ir_to_html, node[1]))
+        return f"<{node[0]}>{children}</{node[0]}>"
+    if node[1] == TEXT:
+        return escape_text(node[0])
+    tag = INLINE_TAGS.get(node[1])
+    if tag is not None:
+        return f"<{tag}>{escape_text(node[0])}</{tag}>"
+    return text_node_to_html(TextNode(*node))
+
+
 def block_to_html_node(block) -> ParentNode:
     block_type = block_to_block_type(block)
     match block_type:
@@ -100,14 +223,34 @@ def text_to_children(text: str) -> List[LeafNode]:
     return children
 
 
-def paragraph_to_html_node(block: str) -> ParentNode:
-    lines = block.split("\n")
-    paragraph = " ".join(lines)
-    children = text_to_children(paragraph)
-    return ParentNode("p", children)
+def text_to_html(text: str, on_nodes: NodeCallback = None) -> str:
+    nodes = text_to_textnodes(text)
+    if on_nodes is not None:
+        on_nodes(nodes)
+    return "".join(map(text_node_to_html, nodes))
 
 
-def heading_to_html_node(block: str) -> ParentNode:
+def text_to_ir(text: str, on_nodes: NodeCallback = None) -> List[IRNode]:
+    nodes = text_to_textnodes(text)
+    if on_nodes is not None:
+        on_nodes(nodes)
+    return [
+        [node.text, node.text_type]
+        if node.url is None
+        else [node.text, node.text_type, node.url]
+        for node in nodes
+    ]
+
+
+def list_items_to_html(items: List[str], on_nodes: NodeCallback = None) -> str:
+    return "".join(f"<li>{text_to_html(item, on_nodes)}</li>" for item in items)
+
+
+def paragraph_text(block: str) -> str:
+    return " ".join(block.split("\n"))
+
+
+def heading_parts(block: str) -> Tuple[int, str]:
     level = 0
     for char in block:
         if char == "#":
@@ -116,47 +259,63 @@ def heading_to_html_node(block: str) -> ParentNode:
             break
     if level + 1 >= len(block):
         raise ValueError(f"Invalid heading level: {block}")
-    text = block[level + 1 :]
-    children = text_to_children(text)
-    return ParentNode(f"h{level}", children)
+    return level, block[level + 1 :]
 
 
-def code_to_html_node(block: str) -> ParentNode:
+def code_text(block: str) -> str:
     if not block.startswith("```") or not block.endswith("```"):
         raise ValueError("Invalid code block")
-    text = block[4:-3]
+    return block[4:-3]
+
+
+def list_items(block: str, marker_length: int) -> List[str]:
+    return [item[marker_length:] for item in block.split("\n")]
+
+
+def quote_text(block: str) -> str:
+    lines = block.split("\n")
+    new_lines: List[str] = []
+    for line in lines:
+        if not line.startswith(">"):
+            raise ValueError("Invalid quote block")
+        new_lines.append(line.lstrip(">").strip())
+    return " ".join(new_lines)
+
+
+def paragraph_to_html_node(block: str) -> ParentNode:
+    children = text_to_children(paragraph_text(block))
+    return ParentNode("p", children)
+
+
+def heading_to_html_node(block: str) -> ParentNode:
+    level, text = heading_parts(block)
     children = text_to_children(text)
+    return ParentNode(f"h{level}", children)
+
+
+def code_to_html_node(block: str) -> ParentNode:
+    # Code is shown verbatim; markdown inside it is not inline markup.
+    children = [LeafNode(None, code_text(block))]
     code = ParentNode("code", children)
     return ParentNode("pre", [code])
 
 
 def olist_to_html_node(block: str) -> ParentNode:
-    items = block.split("\n")
     html_items: List[ParentNode] = []
-    for item in items:
-        text = item[3:]
+    for text in list_items(block, 3):
         children = text_to_children(text)
         html_items.append(ParentNode("li", children))
     return ParentNode("ol", html_items)
 
 
 def ulist_to_html_node(block: str) -> ParentNode:
-    items = block.split("\n")
     html_items: List[ParentNode] = []
-    for item in items:
-        text = item[2:]
+    for text in list_items(block, 2):
         children = text_to_children(text)
         html_items.append(ParentNode("li", children))
     return ParentNode("ul", html_items)
 
 
 def quote_to_html_node(block: str) -> ParentNode:
-    lines = block.split("\n")
-    new_lines: List[str] = []
-    for line in lines:
-        if not line.startswith(">"):
-            raise ValueError("Invalid quote block")
-        new_lines.append(line.lstrip(">").strip())
-    content = " ".join(new_lines)
-    children = text_to_children(content)
+    children = text_to_children(quote_text(block))
     return ParentNode("blockquote", children)
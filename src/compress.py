@@ -0,0 +1,128 @@
+import gzip
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+from manifest import load_manifest, save_manifest, source_entry
+from sync import list_files
+from writer import OutputWriter
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; without it only .gz is written.
+    brotli = None
+
+COMPRESS_EXTENSIONS = {".html", ".css", ".js", ".json", ".svg", ".xml", ".txt"}
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+
+def empty_compress_manifest() -> Dict:
+    return {"files": {}}
+
+
+def compressed_suffixes() -> Tuple[str, ...]:
+    if brotli is None:
+        return (".gz",)
+    return (".gz", ".br")
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(data)
+    os.replace(tmp_path, path)
+
+
+def compress_file(path: str) -> None:
+    with open(path, "rb") as file:
+        data = file.read()
+    # mtime=0 keeps the .gz bytes a function of the content alone.
+    write_atomic(f"{path}.gz", gzip.compress(data, GZIP_LEVEL, mtime=0))
+    if brotli is not None:
+        write_atomic(f"{path}.br", brotli.compress(data, quality=BROTLI_QUALITY))
+
+
+def compressed_siblings(dest_path: str, manifest_file: str) -> List[str]:
+    # The .gz and .br files the last compressing build left in dest_path.
+    manifest = load_manifest(manifest_file, empty_compress_manifest)
+    siblings: List[str] = []
+    for relative_path in manifest["files"]:
+        dest_file = os.path.join(dest_path, relative_path)
+        siblings.extend(dest_file + suffix for suffix in (".gz", ".br"))
+    return siblings
+
+
+def remove_compressed(dest_path: str, manifest_file: str) -> int:
+    removed = 0
+    for sibling in compressed_siblings(dest_path, manifest_file):
+        if os.path.exists(sibling):
+            os.remove(sibling)
+            removed += 1
+    if os.path.exists(manifest_file):
+        os.remove(manifest_file)
+    if removed:
+        print(f"Removed {removed} compressed sibling(s)")
+    return removed
+
+
+def minify_assets(dest_path: str, writer: OutputWriter) -> int:
+    # Pages are minified as they are written; copied assets are minified in
+    # place. The writer replaces the file rather than writing through it, so
+    # a hardlinked static source is never modified.
+    minified = 0
+    for relative_path in list_files(dest_path):
+        dest_file = os.path.join(dest_path, relative_path)
+        minifier = writer.minifier(dest_file)
+        if minifier is None or relative_path.endswith(".html"):
+            continue
+        if writer.recorded(dest_file) is not None:
+            continue
+        with open(dest_file, "r") as file:
+            writer.write(dest_file, file.read())
+        minified += 1
+    return minified
+
+
+def compress_outputs(
+    dest_path: str, manifest_file: str, workers: int = 1
+) -> Tuple[int, int, int]:
+    manifest = load_manifest(manifest_file, empty_compress_manifest)
+    old_files = manifest["files"]
+    files: Dict[str, Dict] = {}
+    jobs: List[str] = []
+    suffixes = compressed_suffixes()
+    for relative_path in list_files(dest_path):
+        if os.path.splitext(relative_path)[1].lower() not in COMPRESS_EXTENSIONS:
+            continue
+        dest_file = os.path.join(dest_path, relative_path)
+        previous = old_files.get(relative_path)
+        entry = source_entry(dest_file, previous, "")
+        del entry["dest"]
+        files[relative_path] = entry
+        if (
+            previous is None
+            or previous["hash"] != entry["hash"]
+            or not all(os.path.exists(dest_file + suffix) for suffix in suffixes)
+        ):
+            jobs.append(dest_file)
+    if workers > 1 and len(jobs) > 1:
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(compress_file, jobs, chunksize=chunksize))
+    else:
+        for dest_file in jobs:
+            compress_file(dest_file)
+    removed = 0
+    for relative_path in old_files.keys() - files.keys():
+        dest_file = os.path.join(dest_path, relative_path)
+        for suffix in (".gz", ".br"):
+            if os.path.exists(dest_file + suffix):
+                os.remove(dest_file + suffix)
+                removed += 1
+    save_manifest({"files": files}, manifest_file)
+    unchanged = len(files) - len(jobs)
+    print(
+        f"Compressed {len(jobs)} file(s) to {', '.join(suffixes)}, "
+        f"{unchanged} unchanged, {removed} stale sibling(s) removed"
+    )
+    return len(jobs), unchanged, removed
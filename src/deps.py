@@ -0,0 +1,185 @@
+import json
+import os
+import posixpath
+import re
+from typing import Dict, List, Optional, Set, Tuple
+from search import TermCollector
+from textnode import TextNode, TextType
+
+EXTERNAL_URL_RE = re.compile(r"^(?:[a-zA-Z][a-zA-Z0-9+.-]*:|//)")
+LINK = TextType.link.name
+IMAGE = TextType.image.name
+
+
+class DependencyCollector:
+    # Fed the TextNodes the renderer produces, so link syntax inside code
+    # spans and code blocks is never mistaken for a dependency. The search
+    # terms of the page are counted from the same nodes when asked for.
+    def __init__(self, terms: bool = False):
+        self.links: Set[str] = set()
+        self.images: Set[str] = set()
+        self.terms = TermCollector() if terms else None
+
+    def add_nodes(self, nodes: List[TextNode]) -> None:
+        for node in nodes:
+            if node.text_type == LINK:
+                self.links.add(node.url)
+            elif node.text_type == IMAGE:
+                self.images.add(node.url)
+        if self.terms is not None:
+            self.terms.add_nodes(nodes)
+
+    def add_result(self, result: Dict) -> None:
+        self.links.update(result["links"])
+        self.images.update(result["images"])
+        if self.terms is not None:
+            self.terms.add_result(result["terms"])
+
+    def result(self) -> Dict:
+        result: Dict = {"links": sorted(self.links), "images": sorted(self.images)}
+        if self.terms is not None:
+            result["terms"] = self.terms.result()
+        return result
+
+
+def page_url(dest_file: str, dest_path: str) -> str:
+    relative_path = os.path.relpath(dest_file, dest_path)
+    return "/" + relative_path.replace(os.sep, "/")
+
+
+def resolve_url(base_url: str, url: str) -> Optional[str]:
+    url = url.split("#", 1)[0].split("?", 1)[0]
+    if url == "" or EXTERNAL_URL_RE.match(url):
+        return None
+    if not url.startswith("/"):
+        url = posixpath.join(posixpath.dirname(base_url), url)
+    resolved = posixpath.normpath(url)
+    if url.endswith("/") and resolved != "/":
+        resolved += "/"
+    return resolved
+
+
+def link_candidates(url: str) -> List[str]:
+    if url.endswith("/"):
+        return [url + "index.html"]
+    return [url, url + ".html", url + "/index.html"]
+
+
+class DependencyIndex:
+    def __init__(self, pages: Optional[Dict] = None, assets: Optional[Dict] = None):
+        self.pages: Dict[str, Dict] = pages or {}
+        self.assets: Dict[str, List[int]] = assets or {}
+        self._reverse: Optional[Dict[str, Set[str]]] = None
+
+    @classmethod
+    def load(cls, path: str) -> "DependencyIndex":
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "r") as file:
+            try:
+                data = json.load(file)
+            except json.JSONDecodeError:
+                return cls()
+        return cls(data.get("pages"), data.get("assets"))
+
+    def save(self, path: str) -> None:
+        dir_path = os.path.dirname(path)
+        if dir_path != "":
+            os.makedirs(dir_path, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump({"pages": self.pages, "assets": self.assets}, file, indent=1)
+        os.replace(tmp_path, path)
+
+    def record(
+        self, source_file: str, url: str, template_file: str, deps: Dict
+    ) -> None:
+        self.pages[source_file] = {
+            "url": url,
+            "template": template_file,
+            "links": deps["links"],
+            "images": deps["images"],
+        }
+        self._reverse = None
+
+    def remove(self, source_file: str) -> None:
+        if self.pages.pop(source_file, None) is not None:
+            self._reverse = None
+
+    def reverse_index(self) -> Dict[str, Set[str]]:
+        if self._reverse is None:
+            reverse: Dict[str, Set[str]] = {}
+            for source_file, page in self.pages.items():
+                reverse.setdefault(page["template"], set()).add(source_file)
+                for url in page["links"] + page["images"]:
+                    target = resolve_url(page["url"], url)
+                    if target is not None:
+                        reverse.setdefault(target, set()).add(source_file)
+            self._reverse = reverse
+        return self._reverse
+
+    def dependents(self, target: str) -> Set[str]:
+        return self.reverse_index().get(target, set())
+
+    def referenced_assets(self) -> Set[str]:
+        assets: Set[str] = set()
+        for page in self.pages.values():
+            for url in page["images"]:
+                target = resolve_url(page["url"], url)
+                if target is not None:
+                    assets.add(target)
+        return assets
+
+    def changed_assets(self, static_path: str) -> Set[str]:
+        changed: Set[str] = set()
+        for asset in self.referenced_assets():
+            if self.assets.get(asset) != asset_stat(static_path, asset):
+                changed.add(asset)
+        return changed
+
+    def update_assets(self, static_path: str) -> None:
+        self.assets = {
+            asset: asset_stat(static_path, asset)
+            for asset in sorted(self.referenced_assets())
+        }
+
+    def broken_links(self, targets: Set[str]) -> List[Tuple[str, str]]:
+        broken: List[Tuple[str, str]] = []
+        for source_file in sorted(self.pages):
+            page = self.pages[source_file]
+            for url in page["links"] + page["images"]:
+                target = resolve_url(page["url"], url)
+                if target is None:
+                    continue
+                if not any(c in targets for c in link_candidates(target)):
+                    broken.append((source_file, url))
+        return broken
+
+    def __repr__(self):
+        return f"DependencyIndex({len(self.pages)} pages, {len(self.assets)} assets)"
+
+
+def asset_stat(static_path: str, asset: str) -> Optional[List[int]]:
+    try:
+        stat = os.stat(os.path.join(static_path, *asset.lstrip("/").split("/")))
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def site_targets(index: DependencyIndex, static_path: str) -> Set[str]:
+    targets = {page["url"] for page in index.pages.values()}
+    for dir_path, _, file_names in os.walk(static_path):
+        for file_name in file_names:
+            file_path = os.path.join(dir_path, file_name)
+            targets.add(page_url(file_path, static_path))
+    return targets
+
+
+def report_broken_links(
+    index: DependencyIndex, static_path: str
+) -> List[Tuple[str, str]]:
+    broken = index.broken_links(site_targets(index, static_path))
+    for source_file, url in broken:
+        print(f"Broken link in {source_file}: {url}")
+    return broken
@@ -0,0 +1,31 @@
+import os
+import tempfile
+import unittest
+from typing import Optional
+
+
+class TempDirTestCase(unittest.TestCase):
+    # Gives each test a fresh temporary directory, self.root, and helpers to
+    # write and read files in it.
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path: str, content: str, mtime_ns: Optional[int] = None) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as file:
+            file.write(content)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+        return path
+
+    def read(self, path: str) -> str:
+        with open(path) as file:
+            return file.read()
+
+    def read_bytes(self, path: str) -> bytes:
+        with open(path, "rb") as file:
+            return file.read()
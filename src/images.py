@@ -0,0 +1,160 @@
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+from manifest import load_manifest, save_manifest, source_entry
+from sync import link_or_copy, list_files
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; without it only sizes are read.
+    Image = None
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
+DEFAULT_WIDTHS = (480, 960, 1600)
+JPEG_QUALITY = 82
+
+
+def empty_image_manifest() -> Dict:
+    return {"images": {}, "derivatives": {}}
+
+
+def image_size(path: str) -> Optional[Tuple[int, int]]:
+    # Header-only fallback for when Pillow is not installed.
+    with open(path, "rb") as file:
+        head = file.read(26)
+        if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+            return struct.unpack(">II", head[16:24])
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", head[6:10])
+        if not head.startswith(b"\xff\xd8"):
+            return None
+        file.seek(2)
+        while True:
+            marker = file.read(2)
+            if len(marker) < 2 or marker[0] != 0xFF:
+                return None
+            if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+                continue
+            length = struct.unpack(">H", file.read(2))[0]
+            if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">HH", file.read(5)[1:])
+                return width, height
+            file.seek(length - 2, os.SEEK_CUR)
+
+
+def variant_path(relative_path: str, width: int) -> str:
+    root, ext = os.path.splitext(relative_path)
+    return f"{root}-{width}w{ext}"
+
+
+def process_image(job: Tuple[str, str, str, Sequence[int]]) -> Dict:
+    source_file, digest, cache_dir, widths = job
+    ext = os.path.splitext(source_file)[1].lower()
+    if Image is None:
+        size = image_size(source_file)
+        if size is None:
+            return {"width": None, "height": None, "variants": []}
+        return {"width": size[0], "height": size[1], "variants": []}
+    os.makedirs(cache_dir, exist_ok=True)
+    variants: List[List] = []
+    with Image.open(source_file) as image:
+        width, height = image.size
+        for variant_width in sorted(widths):
+            if variant_width >= width:
+                break
+            variant_height = max(1, round(height * variant_width / width))
+            cache_file = os.path.join(cache_dir, f"{digest}-{variant_width}{ext}")
+            resized = image.resize((variant_width, variant_height), Image.LANCZOS)
+            if ext in (".jpg", ".jpeg"):
+                resized.save(cache_file, quality=JPEG_QUALITY, optimize=True)
+            else:
+                resized.save(cache_file, optimize=True)
+            variants.append([variant_width, variant_height, cache_file])
+    return {"width": width, "height": height, "variants": variants}
+
+
+def image_attributes(url: str, info: Dict) -> Dict[str, str]:
+    if info["width"] is None:
+        return {}
+    attributes = {"width": str(info["width"]), "height": str(info["height"])}
+    if info["variants"]:
+        candidates = [
+            f"{variant_path(url, variant_width)} {variant_width}w"
+            for variant_width, _, _ in info["variants"]
+        ]
+        candidates.append(f"{url} {info['width']}w")
+        attributes["srcset"] = ", ".join(candidates)
+        width = info["width"]
+        attributes["sizes"] = f"(max-width: {width}px) 100vw, {width}px"
+    return attributes
+
+
+def build_images(
+    static_path: str,
+    dest_path: str,
+    manifest_file: str,
+    cache_dir: str,
+    widths: Sequence[int] = DEFAULT_WIDTHS,
+    workers: int = 1,
+) -> Dict[str, Dict[str, str]]:
+    manifest = load_manifest(manifest_file, empty_image_manifest)
+    old_images = manifest["images"]
+    old_derivatives = manifest["derivatives"]
+    widths_key = ",".join(str(width) for width in sorted(widths))
+    if Image is None:
+        widths_key = "size-only"
+        print("Pillow is not installed; images get width and height but no variants")
+    images: Dict[str, Dict] = {}
+    derivatives: Dict[str, Dict] = {}
+    jobs: Dict[str, Tuple[str, str, str, Sequence[int]]] = {}
+    for relative_path in list_files(static_path):
+        if os.path.splitext(relative_path)[1].lower() not in IMAGE_EXTENSIONS:
+            continue
+        source_file = os.path.join(static_path, relative_path)
+        entry = source_entry(source_file, old_images.get(relative_path), "")
+        del entry["dest"]
+        images[relative_path] = entry
+        key = f"{entry['hash']}:{widths_key}"
+        info = old_derivatives.get(key)
+        if info is not None and all(
+            os.path.exists(variant[2]) for variant in info["variants"]
+        ):
+            derivatives[key] = info
+        elif key not in jobs:
+            jobs[key] = (source_file, entry["hash"], cache_dir, widths)
+    if jobs:
+        print(f"Processing {len(jobs)} image(s)")
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(process_image, jobs.values()))
+        else:
+            results = [process_image(job) for job in jobs.values()]
+        derivatives.update(zip(jobs, results))
+    attributes: Dict[str, Dict[str, str]] = {}
+    for relative_path, entry in images.items():
+        info = derivatives[f"{entry['hash']}:{widths_key}"]
+        entry["variants"] = []
+        for variant_width, _, cache_file in info["variants"]:
+            variant = variant_path(relative_path, variant_width)
+            link_or_copy(cache_file, os.path.join(dest_path, variant))
+            entry["variants"].append(variant)
+        url = "/" + relative_path.replace(os.sep, "/")
+        attributes[url] = image_attributes(url, info)
+    current_variants = {
+        variant for entry in images.values() for variant in entry["variants"]
+    }
+    for entry in old_images.values():
+        for variant in entry.get("variants", []):
+            dest_file = os.path.join(dest_path, variant)
+            if variant not in current_variants and os.path.exists(dest_file):
+                os.remove(dest_file)
+    cache_files = {
+        variant[2] for info in derivatives.values() for variant in info["variants"]
+    }
+    for info in old_derivatives.values():
+        for _, _, cache_file in info["variants"]:
+            if cache_file not in cache_files and os.path.exists(cache_file):
+                os.remove(cache_file)
+    save_manifest({"images": images, "derivatives": derivatives}, manifest_file)
+    return attributes
@@ -2,6 +2,15 @@ from typing import List, Tuple
 import re
 from textnode import TextNode, TextType
 
+IMAGE_RE = re.compile(r"!\[(.*?)\]\((.*?)\)")
+LINK_RE = re.compile(r"(?<!!)\[(.*?)\]\((.*?)\)")
+INLINE_MARKUP_RE = re.compile(r"[*`!\[]")
+DELIMITER_TYPES = {
+    "**": TextType.bold.name,
+    "*": TextType.italic.name,
+    "`": TextType.code.name,
+}
+
 
 def split_nodes_delimiter(
     old_nodes: List[TextNode], delimiter: str, text_type: str
@@ -27,13 +36,11 @@ def split_nodes_delimiter(
 
 
 def extract_markdown_images(text: str) -> List[Tuple[str, str]]:
-    image_re = re.compile(r"!\[(.*?)\]\((.*?)\)")
-    return image_re.findall(text)
+    return IMAGE_RE.findall(text)
 
 
 def extract_markdown_links(text: str) -> List[Tuple[str, str]]:
-    link_re = re.compile(r"(?<!!)\[(.*?)\]\((.*?)\)")
-    return link_re.findall(text)
+    return LINK_RE.findall(text)
 
 
 def split_nodes_image(old_nodes: List[TextNode]) -> List[TextNode]:
@@ -84,7 +91,7 @@ def split_nodes_link(old_nodes: List[TextNode]) -> List[TextNode]:
     return new_nodes
 
 
-def text_to_textnodes(text: str) -> List[TextNode]:
+def text_to_textnodes_legacy(text: str) -> List[TextNode]:
     nodes = [TextNode(text, TextType.text.name)]
     nodes = split_nodes_delimiter(nodes, "**", TextType.bold.name)
     nodes = split_nodes_delimiter(nodes, "*", TextType.italic.name)
@@ -92,3 +99,111 @@ def text_to_textnodes(text: str) -> List[TextNode]:
     nodes = split_nodes_image(nodes)
     nodes = split_nodes_link(nodes)
     return nodes
+
+
+DELIMITER_STAGES = [
+    ("**", TextType.bold.name),
+    ("*", TextType.italic.name),
+    ("`", TextType.code.name),
+]
+
+
+def split_text_images(text: str, nodes: List[TextNode]) -> None:
+    # Same splits as split_nodes_image and split_nodes_link, on one string.
+    # Pieces are cut at the match positions, so each character is copied
+    # once however many images and links the text holds.
+    if "![" not in text:
+        split_text_links(text, nodes)
+        return
+    pos = 0
+    for match in IMAGE_RE.finditer(text):
+        split_text_links(text[pos : match.start()], nodes)
+        nodes.append(TextNode(match.group(1), TextType.image.name, match.group(2)))
+        pos = match.end()
+    split_text_links(text[pos:], nodes)
+
+
+def split_text_links(text: str, nodes: List[TextNode]) -> None:
+    pos = 0
+    if "](" in text:
+        for match in LINK_RE.finditer(text):
+            if match.start() > pos:
+                nodes.append(TextNode(text[pos : match.start()], TextType.text.name))
+            nodes.append(TextNode(match.group(1), TextType.link.name, match.group(2)))
+            pos = match.end()
+    if pos < len(text):
+        nodes.append(TextNode(text[pos:], TextType.text.name))
+
+
+def split_text_delimiters(text: str, stage: int, nodes: List[TextNode]) -> None:
+    # Delimiters are split in the legacy order, so **, * and ` take
+    # precedence over link and image syntax around them.
+    while stage < len(DELIMITER_STAGES) and DELIMITER_STAGES[stage][0] not in text:
+        stage += 1
+    if stage == len(DELIMITER_STAGES):
+        split_text_images(text, nodes)
+        return
+    delimiter, text_type = DELIMITER_STAGES[stage]
+    sections = text.split(delimiter)
+    if len(sections) % 2 == 0:
+        raise ValueError("Invalid markdown, formatted section not closed")
+    for i, section in enumerate(sections):
+        if section == "":
+            continue
+        if i % 2 == 0:
+            split_text_delimiters(section, stage + 1, nodes)
+        else:
+            nodes.append(TextNode(section, text_type))
+
+
+def text_to_textnodes(text: str, legacy: bool = False) -> List[TextNode]:
+    if legacy:
+        return text_to_textnodes_legacy(text)
+    if not INLINE_MARKUP_RE.search(text):
+        return [TextNode(text, TextType.text.name)] if text else []
+    nodes: List[TextNode] = []
+    try:
+        split_text_delimiters(text, 0, nodes)
+    except ValueError:
+        # An odd delimiter count, such as * inside a code span, is resolved
+        # left to right; only markup that is really unclosed raises.
+        return scan_textnodes(text)
+    return nodes
+
+
+def scan_textnodes(text: str) -> List[TextNode]:
+    nodes: List[TextNode] = []
+    text_start = 0
+    pos = 0
+    while True:
+        markup = INLINE_MARKUP_RE.search(text, pos)
+        if markup is None:
+            break
+        start = markup.start()
+        char = text[start]
+        node = None
+        if char == "!" or char == "[":
+            match = (IMAGE_RE if char == "!" else LINK_RE).match(text, start)
+            if match is None:
+                pos = start + 1
+                continue
+            text_type = TextType.image.name if char == "!" else TextType.link.name
+            node = TextNode(match.group(1), text_type, match.group(2))
+            end = match.end()
+        else:
+            delimiter = "**" if text.startswith("**", start) else char
+            close = text.find(delimiter, start + len(delimiter))
+            if close == -1:
+                raise ValueError("Invalid markdown, formatted section not closed")
+            content = text[start + len(delimiter) : close]
+            if content != "":
+                node = TextNode(content, DELIMITER_TYPES[delimiter])
+            end = close + len(delimiter)
+        if start > text_start:
+            nodes.append(TextNode(text[text_start:start], TextType.text.name))
+        if node is not None:
+            nodes.append(node)
+        text_start = pos = end
+    if text_start < len(text):
+        nodes.append(TextNode(text[text_start:], TextType.text.name))
+    return nodes
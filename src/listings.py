@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import posixpath
+import re
+from typing import Dict, List, Optional, Tuple
+from htmlnode import escape_attribute, escape_text
+from manifest import hash_file, load_manifest, save_manifest
+from metadata import SiteIndex
+from template import load_template
+from utils import remove_empty_dirs
+from writer import active_output_writer
+
+PAGE_SIZE = 20
+ARCHIVE_PATH = "archive"
+TAGS_PATH = "tags"
+SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
+def empty_listings_manifest() -> Dict:
+    return {"listings": {}}
+
+
+def slugify(text: str) -> str:
+    return SLUG_RE.sub("-", text.lower()).strip("-") or "untitled"
+
+
+def tag_slugs(tags: List[str]) -> Dict[str, str]:
+    # Tags such as "C" and "C++" slugify alike. A tag that is already its
+    # own slug keeps it; the others get a suffix derived from the tag, so
+    # their URLs do not depend on which other tags exist.
+    by_slug: Dict[str, List[str]] = {}
+    for tag in sorted(tags):
+        by_slug.setdefault(slugify(tag), []).append(tag)
+    slugs: Dict[str, str] = {}
+    for slug, group in by_slug.items():
+        for tag in group:
+            if len(group) == 1 or tag.lower() == slug:
+                slugs[tag] = slug
+            else:
+                suffix = hashlib.sha1(tag.encode()).hexdigest()[:8]
+                slugs[tag] = f"{slug}-{suffix}"
+                print(f"Tag {tag!r} shares the slug {slug!r}; using {slugs[tag]!r}")
+    return slugs
+
+
+def listing_url(base: str, number: int) -> str:
+    prefix = f"/{base}/" if base else "/"
+    if number == 1:
+        return prefix + "index.html"
+    return f"{prefix}page-{number}.html"
+
+
+def paginate(
+    title: str, base: str, entries: List[Dict], page_size: int = PAGE_SIZE
+) -> List[Dict]:
+    starts = range(0, len(entries), page_size)
+    chunks = [entries[start : start + page_size] for start in starts]
+    listings: List[Dict] = []
+    for number, chunk in enumerate(chunks, 1):
+        listings.append(
+            {
+                "title": title if number == 1 else f"{title} (page {number})",
+                "url": listing_url(base, number),
+                "entries": chunk,
+                "newer": listing_url(base, number - 1) if number > 1 else None,
+                "older": (
+                    listing_url(base, number + 1) if number < len(chunks) else None
+                ),
+            }
+        )
+    return listings
+
+
+def page_entry(page: Dict) -> Dict:
+    return {"url": page["url"], "title": page["title"], "date": page.get("date")}
+
+
+def collect_listings(site: SiteIndex, page_size: int = PAGE_SIZE) -> List[Dict]:
+    pages = site.by_date()
+    directories: Dict[str, List[Dict]] = {}
+    for _, page in pages:
+        directory = posixpath.dirname(page["url"]).strip("/")
+        while directory:
+            directories.setdefault(directory, []).append(page_entry(page))
+            directory = posixpath.dirname(directory)
+    groups = [("Archive", ARCHIVE_PATH, [page_entry(page) for _, page in pages])]
+    tags = site.tags()
+    slugs = tag_slugs(list(tags))
+    for tag, source_files in sorted(tags.items()):
+        members = set(source_files)
+        tagged = [page_entry(page) for source, page in pages if source in members]
+        groups.append((f"Tagged {tag}", f"{TAGS_PATH}/{slugs[tag]}", tagged))
+    # A content directory named like the archive or a tag listing keeps its
+    # own listing there.
+    for title, base, _ in groups:
+        if base in directories:
+            print(f"Skipping listing {title!r}: content directory {base}/ exists")
+    groups = [group for group in groups if group[1] not in directories]
+    for directory, entries in sorted(directories.items()):
+        groups.append((directory, directory, entries))
+    # A directory or tag with an authored index page keeps it; the generated
+    # listing is dropped as a whole so it never leaves orphaned later pages.
+    urls = {page["url"] for page in site.pages.values()}
+    listings: List[Dict] = []
+    for title, base, entries in groups:
+        if listing_url(base, 1) not in urls:
+            listings.extend(paginate(title, base, entries, page_size))
+    return listings
+
+
+def render_listing(listing: Dict) -> str:
+    items: List[str] = []
+    for entry in listing["entries"]:
+        url = escape_attribute(entry["url"])
+        item = f'<a href="{url}">{escape_text(entry["title"])}</a>'
+        if entry["date"]:
+            item += f' <time>{escape_text(entry["date"])}</time>'
+        items.append(f"<li>{item}</li>")
+    parts = [f"<h1>{escape_text(listing['title'])}</h1>", f"<ul>{''.join(items)}</ul>"]
+    links: List[str] = []
+    if listing["newer"] is not None:
+        links.append(f'<a href="{escape_attribute(listing["newer"])}">Newer</a>')
+    if listing["older"] is not None:
+        links.append(f'<a href="{escape_attribute(listing["older"])}">Older</a>')
+    if links:
+        parts.append(f"<nav>{' '.join(links)}</nav>")
+    return "".join(parts)
+
+
+def listing_digest(listing: Dict, template_hash: str) -> str:
+    data = json.dumps([template_hash, listing], sort_keys=True)
+    return hashlib.sha1(data.encode()).hexdigest()
+
+
+def listing_dest(listing: Dict, dest_path: str) -> str:
+    return os.path.join(dest_path, *listing["url"].lstrip("/").split("/"))
+
+
+def generate_listings(
+    site: SiteIndex,
+    template_file: str,
+    dest_path: str,
+    listings_file: Optional[str] = None,
+    page_size: int = PAGE_SIZE,
+) -> Tuple[int, int]:
+    manifest = empty_listings_manifest()
+    if listings_file:
+        manifest = load_manifest(listings_file, empty_listings_manifest)
+    old_digests: Dict[str, str] = manifest["listings"]
+    digests: Dict[str, str] = {}
+    template_hash = hash_file(template_file)
+    template = load_template(template_file)
+    writer = active_output_writer()
+    if writer.minify:
+        # Toggling minification changes every listing's output.
+        template_hash += ":minified"
+    generated = 0
+    for listing in collect_listings(site, page_size):
+        dest_file = listing_dest(listing, dest_path)
+        digest = listing_digest(listing, template_hash)
+        digests[dest_file] = digest
+        if old_digests.get(dest_file) == digest and os.path.exists(dest_file):
+            writer.note(dest_file)
+            continue
+        print(f"Generating listing {dest_file}")
+        context = {
+            "Title": escape_text(listing["title"]),
+            "Content": render_listing(listing),
+        }
+        with writer.open(dest_file) as file:
+            template.write(context, file)
+        generated += 1
+    authored = {
+        listing_dest(page, dest_path) for page in site.pages.values()
+    }
+    for dest_file in sorted(old_digests.keys() - digests.keys() - authored):
+        if os.path.exists(dest_file):
+            print(f"Removing listing {dest_file}")
+            os.remove(dest_file)
+            remove_empty_dirs(os.path.dirname(dest_file), dest_path)
+    if listings_file:
+        save_manifest({"listings": digests}, listings_file)
+    unchanged = len(digests) - generated
+    print(f"{generated} listing page(s) generated, {unchanged} unchanged")
+    return generated, unchanged
+
+
+def remove_listings(site: SiteIndex, dest_path: str, listings_file: str) -> int:
+    # Removes what an earlier build generated once listings are turned off.
+    manifest = load_manifest(listings_file, empty_listings_manifest)
+    authored = {listing_dest(page, dest_path) for page in site.pages.values()}
+    removed = 0
+    for dest_file in sorted(manifest["listings"].keys() - authored):
+        if os.path.exists(dest_file):
+            print(f"Removing listing {dest_file}")
+            os.remove(dest_file)
+            remove_empty_dirs(os.path.dirname(dest_file), dest_path)
+            removed += 1
+    if os.path.exists(listings_file):
+        os.remove(listings_file)
+    return removed
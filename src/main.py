@@ -1,9 +1,362 @@
-from utils import recursive_copy, generate_pages_recursive
+import argparse
+import cProfile
+import functools
+import os
+from typing import Optional, Tuple
+import utils
+from ast_cache import configure_ast_cache
+from block_cache import configure_block_cache
+from compress import (
+    compress_outputs,
+    compressed_siblings,
+    minify_assets,
+    remove_compressed,
+)
+from deps import page_url
+from images import DEFAULT_WIDTHS, build_images
+from preview import preview
+from profiler import Profiler
+from metadata import SiteIndex
+from search import SearchIndex
+from textnode import set_image_attributes
+from listings import generate_listings, remove_listings
+from utils import (
+    generate_pages_incremental,
+    generate_pages_recursive,
+    prune_outputs,
+    recursive_copy,
+)
+from sync import sync_tree
+from watch import PageResults, serve, watch
+from writer import active_output_writer, configure_output_writer
+
+MANIFEST_FILE = ".cache/manifest.json"
+ASSETS_MANIFEST_FILE = ".cache/assets.json"
+BLOCK_CACHE_FILE = ".cache/blocks.sqlite3"
+AST_CACHE_FILE = ".cache/ast.sqlite3"
+DEPS_FILE = ".cache/deps.json"
+OUTPUTS_FILE = ".cache/outputs.json"
+SITE_FILE = ".cache/site.json"
+LISTINGS_FILE = ".cache/listings.json"
+SEARCH_FILE = ".cache/search.json"
+IMAGES_MANIFEST_FILE = ".cache/images.json"
+IMAGE_CACHE_DIR = ".cache/images"
+COMPRESS_MANIFEST_FILE = ".cache/compress.json"
+
+
+def parse_widths(text: str) -> Tuple[int, ...]:
+    try:
+        widths = tuple(int(width) for width in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid widths: {text}")
+    if any(width <= 0 for width in widths):
+        raise argparse.ArgumentTypeError(f"invalid widths: {text}")
+    return widths
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build the site into public/")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only re-render pages whose markdown or template changed",
+    )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="only copy new or changed static files instead of wiping public/",
+    )
+    parser.add_argument(
+        "--no-link",
+        action="store_true",
+        help="always copy static files instead of hardlinking them",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=1,
+        help="number of rendering processes (0 uses every core)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="serve public/ and rebuild touched files as they change",
+    )
+    parser.add_argument(
+        "--preview",
+        action="store_true",
+        help="serve pages rendered on demand from content/ instead of building",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8888,
+        help="port for the --watch and --preview servers",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.1,
+        help="seconds between --watch polls",
+    )
+    parser.add_argument(
+        "--block-cache",
+        action="store_true",
+        help="reuse the rendered HTML of identical blocks",
+    )
+    parser.add_argument(
+        "--block-cache-size",
+        type=int,
+        default=4096,
+        help="blocks kept in the in-memory LRU of --block-cache",
+    )
+    parser.add_argument(
+        "--persist-block-cache",
+        action="store_true",
+        help=f"keep the block cache across builds in {BLOCK_CACHE_FILE}",
+    )
+    parser.add_argument(
+        "--ast-cache",
+        action="store_true",
+        help=f"keep parsed pages in {AST_CACHE_FILE} and only re-serialize them",
+    )
+    parser.add_argument(
+        "--async",
+        dest="async_io",
+        action="store_true",
+        help="overlap reads, rendering and writes in an asyncio pipeline",
+    )
+    parser.add_argument(
+        "--io-concurrency",
+        type=int,
+        default=16,
+        help="concurrent reads and writes of the --async pipeline",
+    )
+    parser.add_argument(
+        "--stream-threshold",
+        type=float,
+        default=utils.STREAM_THRESHOLD / (1024 * 1024),
+        help="render sources of at least this many MiB block by block",
+    )
+    parser.add_argument(
+        "--listing-page-size",
+        type=int,
+        default=0,
+        help="generate archive, tag and directory listings with this many "
+        "entries per page (off by default)",
+    )
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        help="build a sharded full-text search index into public/search/",
+    )
+    parser.add_argument(
+        "--images",
+        action="store_true",
+        help="add width/height and resized srcset variants to static images",
+    )
+    parser.add_argument(
+        "--image-widths",
+        type=parse_widths,
+        default=DEFAULT_WIDTHS,
+        help="comma separated widths of the --images variants",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="strip layout whitespace and comments from generated HTML and CSS",
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="write precompressed .gz (and .br with brotli installed) siblings",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="time each pipeline stage per page and print a report (renders serially)",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        help="number of slowest pages listed by --profile",
+    )
+    parser.add_argument(
+        "--profile-json", help="also write the --profile report to this JSON file"
+    )
+    parser.add_argument("--cprofile", help="write cProfile stats of the build here")
+    args = parser.parse_args()
+    if args.workers < 0:
+        parser.error("--workers must not be negative")
+    if args.listing_page_size < 0:
+        parser.error("--listing-page-size must not be negative")
+    if args.workers == 0:
+        args.workers = os.cpu_count() or 1
+    return args
+
+
+def build(args: argparse.Namespace, profiler) -> None:
+    search = SearchIndex.load(SEARCH_FILE) if args.search else None
+    if args.sync or args.incremental:
+        sync_tree(
+            "static",
+            "public",
+            ASSETS_MANIFEST_FILE,
+            link=not args.no_link,
+            minify=args.minify,
+        )
+    else:
+        keep = list(active_output_writer().digests)
+        if args.compress:
+            keep += compressed_siblings("public", COMPRESS_MANIFEST_FILE)
+        recursive_copy("static", "public", keep=keep)
+    if args.images:
+        set_image_attributes(
+            build_images(
+                "static",
+                "public",
+                IMAGES_MANIFEST_FILE,
+                IMAGE_CACHE_DIR,
+                args.image_widths,
+                args.workers,
+            )
+        )
+    if args.incremental:
+        site = generate_pages_incremental(
+            "content",
+            "template.html",
+            "public",
+            MANIFEST_FILE,
+            args.workers,
+            profiler,
+            "static",
+            DEPS_FILE,
+            SITE_FILE,
+            search,
+        )
+    else:
+        site = generate_pages_recursive(
+            "content",
+            "template.html",
+            "public",
+            args.workers,
+            profiler,
+            "static",
+            SITE_FILE,
+            search,
+        )
+    finish_build(args, site, search, prune=not (args.sync or args.incremental))
+
+
+def finish_build(
+    args: argparse.Namespace,
+    site: SiteIndex,
+    search: Optional[SearchIndex],
+    prune: bool = False,
+) -> None:
+    # Everything a build does once pages are rendered; watch rebuilds run it
+    # too.
+    if args.listing_page_size > 0:
+        generate_listings(
+            site, "template.html", "public", LISTINGS_FILE, args.listing_page_size
+        )
+    else:
+        remove_listings(site, "public", LISTINGS_FILE)
+    if search is not None:
+        shards = search.write("public/search", site, active_output_writer())
+        search.save(SEARCH_FILE)
+        terms = len(search.postings)
+        print(f"Search index: {terms} term(s), {shards} shard(s) updated")
+    if args.minify:
+        minify_assets("public", active_output_writer())
+    if prune:
+        prune_outputs("public")
+    if args.compress:
+        compress_outputs("public", COMPRESS_MANIFEST_FILE, args.workers)
+    else:
+        remove_compressed("public", COMPRESS_MANIFEST_FILE)
+
+
+def after_rebuild(args: argparse.Namespace, results: PageResults) -> None:
+    site = SiteIndex.load(SITE_FILE)
+    search = SearchIndex.load(SEARCH_FILE) if args.search else None
+    for source_file, page in results.items():
+        if page is None:
+            site.remove(source_file)
+            if search is not None:
+                search.remove(source_file)
+            continue
+        dest_file, result = page
+        site.record(source_file, page_url(dest_file, "public"), result["meta"])
+        if search is not None:
+            search.update(source_file, result["terms"])
+    site.save(SITE_FILE)
+    finish_build(args, site, search)
 
 
 def main():
-    recursive_copy("static", "public")
-    generate_pages_recursive("content", "template.html", "public")
+    args = parse_args()
+    if args.preview:
+        server = preview("content", "template.html", "static", "public", args.port)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        server.server_close()
+        return
+    utils.STREAM_THRESHOLD = int(args.stream_threshold * 1024 * 1024)
+    utils.SEARCH_TERMS = args.search
+    if args.async_io:
+        utils.IO_CONCURRENCY = max(1, args.io_concurrency)
+    profiler = Profiler() if args.profile or args.profile_json else None
+    output_writer = configure_output_writer(OUTPUTS_FILE, args.minify)
+    block_cache = None
+    if args.block_cache or args.persist_block_cache:
+        block_cache = configure_block_cache(
+            args.block_cache_size,
+            BLOCK_CACHE_FILE if args.persist_block_cache else None,
+        )
+    ast_cache = configure_ast_cache(AST_CACHE_FILE) if args.ast_cache else None
+    if args.cprofile:
+        cprofiler = cProfile.Profile()
+        cprofiler.runcall(build, args, profiler)
+        cprofiler.dump_stats(args.cprofile)
+    else:
+        build(args, profiler)
+    output_writer.save()
+    stats = output_writer.stats()
+    print(f"{stats['written']} page(s) written, {stats['skipped']} identical on disk")
+    if block_cache is not None:
+        stats = block_cache.stats()
+        if sum(stats.values()) > 0:
+            print(
+                f"Block cache: {stats['hits']} hit(s), "
+                f"{stats['disk_hits']} disk hit(s), {stats['misses']} miss(es)"
+            )
+    if ast_cache is not None:
+        ast_cache.flush()
+        stats = ast_cache.stats()
+        if sum(stats.values()) > 0:
+            print(f"AST cache: {stats['hits']} hit(s), {stats['misses']} miss(es)")
+    if profiler is not None:
+        print(profiler.report(args.profile_top))
+        if args.profile_json:
+            profiler.dump_json(args.profile_json, args.profile_top)
+    if args.watch:
+        serve("public", args.port)
+        try:
+            watch(
+                "content",
+                "template.html",
+                "static",
+                "public",
+                args.interval,
+                functools.partial(after_rebuild, args),
+            )
+        except KeyboardInterrupt:
+            pass
 
 
 if __name__ == "__main__":
@@ -0,0 +1,57 @@
+import hashlib
+import json
+import os
+from typing import Callable, Dict, Optional
+
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def empty_manifest() -> Dict:
+    return {"template": None, "pages": {}}
+
+
+def load_manifest(path: str, empty: Callable[[], Dict] = empty_manifest) -> Dict:
+    if not os.path.exists(path):
+        return empty()
+    with open(path, "r") as file:
+        try:
+            manifest = json.load(file)
+        except json.JSONDecodeError:
+            return empty()
+    if not isinstance(manifest, dict) or not empty().keys() <= manifest.keys():
+        return empty()
+    return manifest
+
+
+def save_manifest(manifest: Dict, path: str) -> None:
+    dir_path = os.path.dirname(path)
+    if dir_path != "":
+        os.makedirs(dir_path, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as file:
+        json.dump(manifest, file, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def source_entry(path: str, previous: Optional[Dict], dest: str) -> Dict:
+    stat = os.stat(path)
+    if (
+        previous is not None
+        and previous.get("size") == stat.st_size
+        and previous.get("mtime") == stat.st_mtime_ns
+    ):
+        digest = previous["hash"]
+    else:
+        digest = hash_file(path)
+    return {
+        "hash": digest,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "dest": dest,
+    }
@@ -0,0 +1,159 @@
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional, TextIO, Tuple
+import block_markdown
+from htmlnode import escape_text
+
+FRONT_MATTER_DELIMITER = "---"
+TITLE_LINE_RE = re.compile(r"^#[^\S\n].*$", re.MULTILINE)
+LIST_FIELDS = {"tags"}
+
+
+def parse_front_matter(lines: Iterable[str]) -> Dict:
+    front_matter: Dict = {}
+    for line in lines:
+        line = line.strip()
+        if line == "" or line.startswith("#"):
+            continue
+        key, sep, value = line.partition(":")
+        if sep == "" or key.strip() == "":
+            raise ValueError(f"Invalid front matter line: {line}")
+        key = key.strip().lower()
+        value = value.strip()
+        if key in LIST_FIELDS:
+            value = value.strip("[]")
+            front_matter[key] = [
+                item.strip().strip("\"'") for item in value.split(",") if item.strip()
+            ]
+        else:
+            front_matter[key] = value.strip("\"'")
+    return front_matter
+
+
+def split_front_matter(markdown: str) -> Tuple[Dict, str]:
+    if not markdown.startswith(FRONT_MATTER_DELIMITER + "\n"):
+        return {}, markdown
+    start = len(FRONT_MATTER_DELIMITER) + 1
+    end = markdown.find("\n" + FRONT_MATTER_DELIMITER, start - 1)
+    while end != -1:
+        after = end + len(FRONT_MATTER_DELIMITER) + 1
+        if after == len(markdown) or markdown[after] == "\n":
+            lines = markdown[start:end].split("\n")
+            return parse_front_matter(lines), markdown[after + 1 :]
+        end = markdown.find("\n" + FRONT_MATTER_DELIMITER, after)
+    return {}, markdown
+
+
+def read_front_matter(file: TextIO) -> Dict:
+    # Consumes the front matter of a source opened as a text file, leaving
+    # the file at the start of the body. The closing delimiter is found
+    # before the block is parsed line by line, and a source that never closes
+    # it is rewound, so no part of a large source is held in memory.
+    start = file.tell()
+    if file.readline().rstrip("\n") != FRONT_MATTER_DELIMITER:
+        file.seek(start)
+        return {}
+    count = 0
+    while True:
+        line = file.readline()
+        if line == "":
+            file.seek(start)
+            return {}
+        if line.rstrip("\n") == FRONT_MATTER_DELIMITER:
+            break
+        count += 1
+    file.seek(start)
+    file.readline()
+    front_matter = parse_front_matter(file.readline() for _ in range(count))
+    file.readline()
+    return front_matter
+
+
+def title_from_blocks(blocks: Iterable[str]) -> str:
+    for block in blocks:
+        match = TITLE_LINE_RE.search(block)
+        if match is not None:
+            return match.group(0).lstrip("# ")
+    raise Exception("No title found")
+
+
+def page_metadata(front_matter: Dict, title: Optional[str]) -> Dict:
+    metadata = dict(front_matter)
+    if "title" not in metadata:
+        if title is None:
+            raise Exception("No title found")
+        metadata["title"] = title
+    metadata.setdefault("tags", [])
+    return metadata
+
+
+def parse_page(markdown: str) -> Tuple[Dict, List[str]]:
+    front_matter, body = split_front_matter(markdown)
+    blocks = block_markdown.markdown_to_blocks(body)
+    title = None
+    if "title" not in front_matter:
+        title = title_from_blocks(blocks)
+    return page_metadata(front_matter, title), blocks
+
+
+def template_fields(metadata: Dict) -> Dict[str, str]:
+    fields: Dict[str, str] = {}
+    for key, value in metadata.items():
+        if isinstance(value, list):
+            value = ", ".join(value)
+        fields[key.capitalize()] = escape_text(str(value))
+    return fields
+
+
+class SiteIndex:
+    def __init__(self, pages: Optional[Dict] = None):
+        self.pages: Dict[str, Dict] = pages or {}
+
+    @classmethod
+    def load(cls, path: str) -> "SiteIndex":
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "r") as file:
+            try:
+                data = json.load(file)
+            except json.JSONDecodeError:
+                return cls()
+        return cls(data.get("pages"))
+
+    def save(self, path: str) -> None:
+        dir_path = os.path.dirname(path)
+        if dir_path != "":
+            os.makedirs(dir_path, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump({"pages": self.pages}, file, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def record(self, source_file: str, url: str, metadata: Dict) -> None:
+        self.pages[source_file] = {**metadata, "url": url}
+
+    def remove(self, source_file: str) -> None:
+        self.pages.pop(source_file, None)
+
+    def by_date(self) -> List[Tuple[str, Dict]]:
+        # Newest first; undated pages go last in source order.
+        dated = sorted(
+            (item for item in self.pages.items() if item[1].get("date")),
+            key=lambda item: (item[1]["date"], item[0]),
+            reverse=True,
+        )
+        undated = sorted(
+            item for item in self.pages.items() if not item[1].get("date")
+        )
+        return dated + undated
+
+    def tags(self) -> Dict[str, List[str]]:
+        tags: Dict[str, List[str]] = {}
+        for source_file in sorted(self.pages):
+            for tag in self.pages[source_file]["tags"]:
+                tags.setdefault(tag, []).append(source_file)
+        return tags
+
+    def __repr__(self):
+        return f"SiteIndex({len(self.pages)} pages)"
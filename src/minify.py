@@ -0,0 +1,60 @@
+import re
+from typing import Callable, Dict
+
+# Whitespace inside these elements is significant and kept verbatim.
+HTML_RAW_RE = re.compile(
+    r"(<(pre|textarea|script|style)\b.*?</\2\s*>)", re.DOTALL | re.IGNORECASE
+)
+HTML_LAYOUT_RE = re.compile(r"(?:(?<=>)|^)\s*\n\s*(?=<|$)")
+HTML_WHITESPACE_RE = re.compile(r"\s*\n\s*")
+HTML_COMMENT_RE = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+CSS_TOKEN_RE = re.compile(
+    r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')"""
+    r"|/\*.*?\*/"
+    r"|\s*([{};,>])\s*"
+    r"|(:)\s+"
+    r"|\s+",
+    re.DOTALL,
+)
+
+
+def minify_html_text(html: str) -> str:
+    # Only whitespace runs that contain a newline are layout of the
+    # template; runs within a line can be meaningful between inline tags.
+    html = HTML_COMMENT_RE.sub("", html)
+    html = HTML_LAYOUT_RE.sub("", html)
+    return HTML_WHITESPACE_RE.sub(" ", html)
+
+
+def minify_html(html: str) -> str:
+    parts = HTML_RAW_RE.split(html)
+    minified = []
+    # split() interleaves text with the raw element and its tag name.
+    for i in range(0, len(parts), 3):
+        minified.append(minify_html_text(parts[i]))
+        if i + 1 < len(parts):
+            minified.append(parts[i + 1])
+    return "".join(minified).strip()
+
+
+def _css_token(match: re.Match) -> str:
+    if match.group(1) is not None:
+        return match.group(1)
+    if match.group(2) is not None:
+        return match.group(2)
+    if match.group(3) is not None:
+        return ":"
+    if match.group(0).startswith("/*"):
+        return ""
+    return " "
+
+
+def minify_css(css: str) -> str:
+    css = CSS_TOKEN_RE.sub(_css_token, css)
+    return css.replace(";}", "}").strip()
+
+
+MINIFIERS: Dict[str, Callable[[str], str]] = {
+    ".html": minify_html,
+    ".css": minify_css,
+}
@@ -0,0 +1,184 @@
+import hashlib
+import mimetypes
+import os
+import posixpath
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import unquote, urlsplit
+from template import load_template
+from utils import render_page
+
+Stamp = Tuple[int, int]
+
+
+def file_stamp(path: str) -> Optional[Stamp]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def make_etag(data: bytes) -> str:
+    return f'"{hashlib.sha256(data).hexdigest()[:20]}"'
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    if header is None:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def url_to_relative(url: str) -> Optional[str]:
+    path = unquote(urlsplit(url).path)
+    relative = posixpath.normpath("/" + path.lstrip("/")).lstrip("/")
+    if relative == ".":
+        relative = ""
+    if relative.startswith(".."):
+        return None
+    if path.endswith("/") and relative:
+        relative += "/"
+    return relative
+
+
+class PreviewSite:
+    def __init__(
+        self,
+        content_path: str,
+        template_file: str,
+        static_path: str,
+        dest_path: Optional[str] = None,
+    ):
+        self.content_path = content_path
+        self.template_file = template_file
+        self.static_path = static_path
+        # Listings, search shards and image variants only exist after a
+        # build, so they are served from its output when present.
+        self.dest_path = dest_path
+        self.pages: Dict[str, Tuple[Stamp, Stamp, bytes, str]] = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.renders = 0
+
+    def page_sources(self, relative: str) -> List[str]:
+        base = relative.rstrip("/")
+        if relative == "" or relative.endswith("/"):
+            return [os.path.join(self.content_path, base, "index.md")]
+        root, ext = posixpath.splitext(base)
+        if ext == ".html":
+            return [os.path.join(self.content_path, root + ".md")]
+        if ext == "":
+            return [
+                os.path.join(self.content_path, base + ".md"),
+                os.path.join(self.content_path, base, "index.md"),
+            ]
+        return []
+
+    def render(self, source_file: str) -> Optional[Tuple[bytes, str]]:
+        stamp = file_stamp(source_file)
+        template_stamp = file_stamp(self.template_file)
+        if stamp is None or template_stamp is None:
+            return None
+        with self.lock:
+            cached = self.pages.get(source_file)
+            if cached is not None and cached[:2] == (stamp, template_stamp):
+                self.hits += 1
+                return cached[2], cached[3]
+        with open(source_file, "r") as file:
+            markdown = file.read()
+        page, _ = render_page(markdown, load_template(self.template_file))
+        body = page.encode()
+        etag = make_etag(body)
+        with self.lock:
+            self.pages[source_file] = (stamp, template_stamp, body, etag)
+            self.renders += 1
+        return body, etag
+
+    def static_file(self, relative: str) -> Optional[str]:
+        roots = [self.static_path]
+        if self.dest_path is not None:
+            roots.append(self.dest_path)
+        for root in roots:
+            path = os.path.join(root, *relative.split("/"))
+            if os.path.isdir(path):
+                path = os.path.join(path, "index.html")
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def resolve(self, url: str) -> Optional[Tuple[str, Union[bytes, str], str]]:
+        # Returns the content type, the body or the path of a static file,
+        # and the ETag.
+        relative = url_to_relative(url)
+        if relative is None:
+            return None
+        for source_file in self.page_sources(relative):
+            rendered = self.render(source_file)
+            if rendered is not None:
+                return "text/html; charset=utf-8", rendered[0], rendered[1]
+        path = self.static_file(relative.rstrip("/"))
+        if path is None:
+            return None
+        stamp = file_stamp(path)
+        if stamp is None:
+            return None
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        return content_type, path, f'"{stamp[0]:x}-{stamp[1]:x}"'
+
+
+class PreviewHandler(BaseHTTPRequestHandler):
+    site: PreviewSite
+
+    def do_GET(self):
+        self.respond(send_body=True)
+
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def respond(self, send_body: bool) -> None:
+        try:
+            resolved = self.site.resolve(self.path)
+        except Exception as e:
+            self.send_error(500, f"{type(e).__name__}: {e}")
+            return
+        if resolved is None:
+            self.send_error(404)
+            return
+        content_type, body, etag = resolved
+        if etag_matches(self.headers.get("If-None-Match"), etag):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            return
+        if isinstance(body, str):
+            with open(body, "rb") as file:
+                body = file.read()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        # Browsers revalidate on every load, which costs a 304 at most.
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+
+def preview(
+    content_path: str,
+    template_file: str,
+    static_path: str,
+    dest_path: Optional[str],
+    port: int,
+) -> ThreadingHTTPServer:
+    site = PreviewSite(content_path, template_file, static_path, dest_path)
+    handler = type("Handler", (PreviewHandler,), {"site": site})
+    server = ThreadingHTTPServer(("", port), handler)
+    print(f"Previewing {content_path} on http://localhost:{server.server_port}")
+    return server
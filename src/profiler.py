@@ -0,0 +1,125 @@
+import json
+import math
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, List
+import block_markdown
+
+INSTRUMENTED_FUNCTIONS = [
+    "markdown_to_blocks",
+    "block_to_block_type",
+    "text_to_textnodes",
+]
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, math.ceil(fraction * len(ordered)) - 1)
+    return ordered[index]
+
+
+class Profiler:
+    def __init__(self):
+        self.pages: Dict[str, Dict[str, float]] = {}
+        self._current: Dict[str, float] = defaultdict(float)
+        self._nested: List[float] = []
+
+    @contextmanager
+    def page(self, name: str):
+        self._current = defaultdict(float)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._current["total"] = time.perf_counter() - start
+            self.pages[name] = dict(self._current)
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        self._nested.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._current[name] += elapsed - self._nested.pop()
+            if self._nested:
+                self._nested[-1] += elapsed
+
+    def timed(self, name: str, func: Callable) -> Callable:
+        def wrapper(*args, **kwargs):
+            with self.stage(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    @contextmanager
+    def instrument(self):
+        originals = {
+            name: getattr(block_markdown, name) for name in INSTRUMENTED_FUNCTIONS
+        }
+        for name, func in originals.items():
+            setattr(block_markdown, name, self.timed(name, func))
+        try:
+            yield self
+        finally:
+            for name, func in originals.items():
+                setattr(block_markdown, name, func)
+
+    def stages(self) -> List[str]:
+        names: List[str] = []
+        for timings in self.pages.values():
+            for name in timings:
+                if name != "total" and name not in names:
+                    names.append(name)
+        return names
+
+    def summary(self, slowest: int = 10) -> Dict:
+        totals = {
+            name: sum(timings.get(name, 0.0) for timings in self.pages.values())
+            for name in self.stages() + ["total"]
+        }
+        page_totals = [timings["total"] for timings in self.pages.values()]
+        return {
+            "pages": len(self.pages),
+            "totals": totals,
+            "percentiles": {
+                "p50": percentile(page_totals, 0.50),
+                "p90": percentile(page_totals, 0.90),
+                "p99": percentile(page_totals, 0.99),
+                "max": max(page_totals, default=0.0),
+            },
+            "slowest": sorted(
+                ((name, timings["total"]) for name, timings in self.pages.items()),
+                key=lambda item: item[1],
+                reverse=True,
+            )[:slowest],
+        }
+
+    def report(self, slowest: int = 10) -> str:
+        summary = self.summary(slowest)
+        total = summary["totals"]["total"] or 1.0
+        lines = [f"Profiled {summary['pages']} page(s)", "", "Stage totals:"]
+        for name in self.stages():
+            seconds = summary["totals"][name]
+            share = seconds / total
+            lines.append(f"  {name:<22}{seconds * 1000:10.2f} ms {share:7.1%}")
+        lines.append(f"  {'total':<22}{summary['totals']['total'] * 1000:10.2f} ms")
+        lines.append("")
+        lines.append("Per-page time:")
+        for name, seconds in summary["percentiles"].items():
+            lines.append(f"  {name:<22}{seconds * 1000:10.2f} ms")
+        lines.append("")
+        lines.append(f"Slowest {len(summary['slowest'])} page(s):")
+        for name, seconds in summary["slowest"]:
+            lines.append(f"  {seconds * 1000:10.2f} ms  {name}")
+        return "\n".join(lines)
+
+    def dump_json(self, path: str, slowest: int = 10) -> None:
+        report = self.summary(slowest)
+        report["page_timings"] = self.pages
+        with open(path, "w") as file:
+            json.dump(report, file, indent=1)
@@ -0,0 +1,179 @@
+import json
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set
+from metadata import SiteIndex
+from textnode import TextNode
+from writer import OutputWriter
+
+TERM_RE = re.compile(r"\w+")
+PREFIX_LENGTH = 2
+SHARD_NAME_RE = re.compile(r"[a-z0-9]+")
+PAGES_FILE = "pages.json"
+
+
+class TermCollector:
+    def __init__(self):
+        self.terms: Counter = Counter()
+
+    def add_nodes(self, nodes: Iterable[TextNode]) -> None:
+        for node in nodes:
+            self.terms.update(TERM_RE.findall(node.text.lower()))
+
+    def add_result(self, terms: Dict[str, int]) -> None:
+        self.terms.update(terms)
+
+    def result(self) -> Dict[str, int]:
+        return dict(sorted(self.terms.items()))
+
+
+def shard_name(prefix: str) -> str:
+    if SHARD_NAME_RE.fullmatch(prefix):
+        return f"{prefix}.json"
+    return f"_{prefix.encode().hex()}.json"
+
+
+def encode_postings(postings: Dict[int, int]) -> List[int]:
+    # Flat [id gap, term frequency, ...] pairs over ascending page IDs.
+    encoded: List[int] = []
+    previous = 0
+    for page_id in sorted(postings):
+        encoded.append(page_id - previous)
+        encoded.append(postings[page_id])
+        previous = page_id
+    return encoded
+
+
+def decode_postings(encoded: List[int]) -> Dict[int, int]:
+    postings: Dict[int, int] = {}
+    page_id = 0
+    for i in range(0, len(encoded), 2):
+        page_id += encoded[i]
+        postings[page_id] = encoded[i + 1]
+    return postings
+
+
+class SearchIndex:
+    def __init__(
+        self,
+        ids: Optional[Dict[str, int]] = None,
+        pages: Optional[Dict[str, Dict[str, int]]] = None,
+        next_id: int = 0,
+    ):
+        # Page IDs are never reused, so shards a browser already cached stay
+        # valid for the pages they mention.
+        self.ids: Dict[str, int] = ids or {}
+        self.pages: Dict[str, Dict[str, int]] = pages or {}
+        self.next_id = next_id
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.dirty: Set[str] = set()
+        for source_file, terms in self.pages.items():
+            self.add_postings(self.ids[source_file], terms)
+
+    @classmethod
+    def load(cls, path: str) -> "SearchIndex":
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "r") as file:
+            try:
+                data = json.load(file)
+            except json.JSONDecodeError:
+                return cls()
+        return cls(data.get("ids"), data.get("pages"), data.get("next_id", 0))
+
+    def save(self, path: str) -> None:
+        dir_path = os.path.dirname(path)
+        if dir_path != "":
+            os.makedirs(dir_path, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(
+                {"ids": self.ids, "pages": self.pages, "next_id": self.next_id},
+                file,
+                separators=(",", ":"),
+            )
+        os.replace(tmp_path, path)
+
+    def add_postings(self, page_id: int, terms: Dict[str, int]) -> None:
+        for term, count in terms.items():
+            self.postings.setdefault(term, {})[page_id] = count
+
+    def remove_postings(self, page_id: int, terms: Dict[str, int]) -> None:
+        for term in terms:
+            postings = self.postings[term]
+            del postings[page_id]
+            if not postings:
+                del self.postings[term]
+
+    def update(self, source_file: str, terms: Dict[str, int]) -> None:
+        old_terms = self.pages.get(source_file)
+        if old_terms == terms:
+            return
+        if source_file not in self.ids:
+            self.ids[source_file] = self.next_id
+            self.next_id += 1
+        page_id = self.ids[source_file]
+        if old_terms is None:
+            old_terms = {}
+        else:
+            self.remove_postings(page_id, old_terms)
+        self.pages[source_file] = terms
+        self.add_postings(page_id, terms)
+        # Only shards holding a term whose frequency on this page changed
+        # need rewriting.
+        self.dirty.update(
+            term[:PREFIX_LENGTH]
+            for term in old_terms.keys() | terms.keys()
+            if old_terms.get(term) != terms.get(term)
+        )
+
+    def remove(self, source_file: str) -> None:
+        terms = self.pages.pop(source_file, None)
+        if terms is None:
+            return
+        page_id = self.ids.pop(source_file)
+        self.remove_postings(page_id, terms)
+        self.dirty.update(term[:PREFIX_LENGTH] for term in terms)
+
+    def shards(self) -> Dict[str, Dict[str, Dict[int, int]]]:
+        shards: Dict[str, Dict[str, Dict[int, int]]] = {}
+        for term, postings in self.postings.items():
+            shards.setdefault(term[:PREFIX_LENGTH], {})[term] = postings
+        return shards
+
+    def write(self, dest_dir: str, site: SiteIndex, writer: OutputWriter) -> int:
+        written = 0
+        shards = self.shards()
+        for prefix in sorted(self.dirty | shards.keys()):
+            shard_file = os.path.join(dest_dir, shard_name(prefix))
+            if prefix not in shards:
+                if os.path.exists(shard_file):
+                    os.remove(shard_file)
+                continue
+            if prefix not in self.dirty and os.path.exists(shard_file):
+                writer.note(shard_file)
+                continue
+            shard = {
+                term: encode_postings(postings)
+                for term, postings in sorted(shards[prefix].items())
+            }
+            writer.write(shard_file, json.dumps(shard, separators=(",", ":")))
+            written += 1
+        pages = {
+            page_id: [site.pages[source]["url"], site.pages[source]["title"]]
+            for source, page_id in sorted(self.ids.items(), key=lambda item: item[1])
+            if source in site.pages
+        }
+        writer.write(
+            os.path.join(dest_dir, PAGES_FILE),
+            json.dumps(
+                {"prefix_length": PREFIX_LENGTH, "pages": pages},
+                separators=(",", ":"),
+            ),
+        )
+        self.dirty.clear()
+        return written
+
+    def __repr__(self):
+        return f"SearchIndex({len(self.pages)} pages, {len(self.postings)} terms)"
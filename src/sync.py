@@ -0,0 +1,81 @@
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+from manifest import load_manifest, save_manifest
+from minify import MINIFIERS
+from utils import remove_empty_dirs
+
+
+def empty_asset_manifest() -> Dict:
+    return {"assets": {}, "minify": False}
+
+
+def list_files(source: str) -> List[str]:
+    files: List[str] = []
+    for dir_path, dir_names, file_names in os.walk(source):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            files.append(os.path.relpath(os.path.join(dir_path, file_name), source))
+    return files
+
+
+def link_or_copy(source_file: str, dest_file: str, link: bool = True) -> None:
+    os.makedirs(os.path.dirname(dest_file) or ".", exist_ok=True)
+    tmp_file = f"{dest_file}.sync-tmp"
+    if os.path.lexists(tmp_file):
+        os.remove(tmp_file)
+    try:
+        if not link:
+            raise OSError("hardlinks disabled")
+        os.link(source_file, tmp_file)
+    except OSError:
+        shutil.copy2(source_file, tmp_file)
+    os.replace(tmp_file, dest_file)
+
+
+def sync_tree(
+    source: str,
+    destination: str,
+    manifest_file: str,
+    workers: int = 8,
+    link: bool = True,
+    minify: bool = False,
+) -> Tuple[int, int, int]:
+    manifest = load_manifest(manifest_file, empty_asset_manifest)
+    old_assets = manifest["assets"]
+    # Assets minified in place by the last build are copied again when the
+    # flag changes, so turning it off restores the source files.
+    recopy = set(MINIFIERS) if manifest.get("minify", False) != minify else set()
+    assets: Dict[str, Dict] = {}
+    jobs: List[Tuple[str, str]] = []
+    for relative_path in list_files(source):
+        source_file = os.path.join(source, relative_path)
+        dest_file = os.path.join(destination, relative_path)
+        stat = os.stat(source_file)
+        entry = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+        if (
+            old_assets.get(relative_path) != entry
+            or not os.path.exists(dest_file)
+            or os.path.splitext(relative_path)[1].lower() in recopy
+        ):
+            jobs.append((source_file, dest_file))
+        assets[relative_path] = entry
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        list(executor.map(lambda job: link_or_copy(*job, link=link), jobs))
+    removed = 0
+    for relative_path in old_assets:
+        if relative_path in assets:
+            continue
+        dest_file = os.path.join(destination, relative_path)
+        if os.path.exists(dest_file):
+            os.remove(dest_file)
+            remove_empty_dirs(os.path.dirname(dest_file), destination)
+            removed += 1
+    save_manifest({"assets": assets, "minify": minify}, manifest_file)
+    unchanged = len(assets) - len(jobs)
+    print(
+        f"Synced {source} to {destination}: {len(jobs)} copied, "
+        f"{unchanged} unchanged, {removed} removed"
+    )
+    return len(jobs), unchanged, removed
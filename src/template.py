@@ -0,0 +1,61 @@
+import os
+import re
+from collections.abc import Iterator
+from typing import Dict, List, Tuple
+from htmlnode import HTMLNode
+
+PLACEHOLDER_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class Template:
+    def __init__(self, source: str):
+        self.chunks: List[str] = []
+        self.slots: List[str] = []
+        pos = 0
+        for match in PLACEHOLDER_RE.finditer(source):
+            self.chunks.append(source[pos : match.start()])
+            self.slots.append(match.group(1))
+            pos = match.end()
+        self.chunks.append(source[pos:])
+
+    def write(self, context: Dict, file) -> None:
+        file.write(self.chunks[0])
+        for slot, chunk in zip(self.slots, self.chunks[1:]):
+            value = context.get(slot)
+            if isinstance(value, HTMLNode):
+                value.write_html(file)
+            elif isinstance(value, (list, Iterator)):
+                file.writelines(value)
+            elif value is not None:
+                file.write(str(value))
+            file.write(chunk)
+
+    def render(self, context: Dict) -> str:
+        parts = [self.chunks[0]]
+        for slot, chunk in zip(self.slots, self.chunks[1:]):
+            value = context.get(slot)
+            if isinstance(value, HTMLNode):
+                parts.append(value.to_html())
+            elif isinstance(value, (list, Iterator)):
+                parts.extend(value)
+            elif value is not None:
+                parts.append(str(value))
+            parts.append(chunk)
+        return "".join(parts)
+
+    def __repr__(self):
+        return f"Template(slots: {self.slots})"
+
+
+_templates: Dict[str, Tuple[int, Template]] = {}
+
+
+def load_template(path: str) -> Template:
+    mtime = os.stat(path).st_mtime_ns
+    cached = _templates.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, "r") as file:
+        template = Template(file.read())
+    _templates[path] = (mtime, template)
+    return template
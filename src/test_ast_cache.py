@@ -0,0 +1,112 @@
+import os
+import sqlite3
+import unittest
+import ast_cache
+import textnode
+from fixtures import TempDirTestCase
+from ast_cache import AstCache, parse_document
+from block_markdown import block_to_html, block_to_ir, ir_to_html, markdown_to_blocks
+
+MARKDOWN = """---
+tags: [a, b]
+---
+# Title
+
+Some **bold**, _italic_ and `a < b` text with a [link](/x)
+
+```
+code && more
+```
+
+* one
+* ![img](/i.png)
+
+1. first
+2. second
+
+> quote"""
+
+
+class TestIR(unittest.TestCase):
+    def test_ir_matches_block_to_html(self):
+        for block in markdown_to_blocks(MARKDOWN.split("---\n", 2)[2]):
+            self.assertEqual(block_to_html(block), ir_to_html(block_to_ir(block)))
+
+    def test_ir_shape(self):
+        self.assertEqual(
+            ["ul", [["li", [["a", "bold"]]], ["li", [["b", "text"], ["c", "code"]]]]],
+            block_to_ir("* **a**\n* b`c`"),
+        )
+        self.assertEqual(["p", [["x", "link", "/y"]]], block_to_ir("[x](/y)"))
+
+    def test_image_attributes_apply_when_serializing(self):
+        ir = block_to_ir("![alt](/i.png)")
+        textnode.set_image_attributes({"/i.png": {"width": "4"}})
+        try:
+            self.assertEqual(
+                '<p><img src="/i.png" alt="alt" width="4"></img></p>', ir_to_html(ir)
+            )
+        finally:
+            textnode.set_image_attributes({})
+
+
+class TestAstCache(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.root, "cache", "ast.sqlite3")
+
+    def test_document(self):
+        document = parse_document(MARKDOWN, terms=True)
+        self.assertEqual({"tags": ["a", "b"], "title": "Title"}, document["meta"])
+        self.assertEqual(["/x"], document["links"])
+        self.assertEqual(["/i.png"], document["images"])
+        self.assertEqual(1, document["terms"]["bold"])
+
+    def test_persists_between_builds(self):
+        cache = AstCache(self.path)
+        first = cache.parse(MARKDOWN)
+        cache.close()
+        self.assertEqual({"hits": 0, "misses": 1}, cache.stats())
+        cache = AstCache(self.path)
+        self.assertEqual(first, cache.parse(MARKDOWN))
+        self.assertEqual({"hits": 1, "misses": 0}, cache.stats())
+        cache.close()
+
+    def test_terms_are_added_on_demand(self):
+        cache = AstCache(self.path)
+        self.assertNotIn("terms", cache.parse(MARKDOWN))
+        self.assertIn("terms", cache.parse(MARKDOWN, terms=True))
+        self.assertEqual({"hits": 0, "misses": 2}, cache.stats())
+        cache.close()
+
+    def test_parser_version_change_discards_documents(self):
+        cache = AstCache(self.path)
+        cache.parse(MARKDOWN)
+        cache.close()
+        version = ast_cache.PARSER_VERSION
+        ast_cache.PARSER_VERSION = version + 1
+        try:
+            cache = AstCache(self.path)
+            cache.parse(MARKDOWN)
+            self.assertEqual({"hits": 0, "misses": 1}, cache.stats())
+            cache.close()
+        finally:
+            ast_cache.PARSER_VERSION = version
+        db = sqlite3.connect(self.path)
+        self.assertEqual(
+            [(version + 1,)], db.execute("SELECT version FROM documents").fetchall()
+        )
+        db.close()
+
+    def test_corrupt_database_is_replaced(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as file:
+            file.write("not a database")
+        cache = AstCache(self.path)
+        cache.parse(MARKDOWN)
+        cache.close()
+        self.assertEqual({"hits": 0, "misses": 1}, cache.stats())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import contextlib
+import io
+import os
+import unittest
+import utils
+from fixtures import TempDirTestCase
+from async_build import generate_pages_async
+from block_cache import configure_block_cache
+from utils import find_pages, generate_pages
+
+
+class TestAsyncBuild(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        for i in range(12):
+            self.write(
+                os.path.join(self.content, f"dir-{i % 3}", f"page-{i}.md"),
+                f"# Page {i}\n\nSome **text** with a [link](/dir-0/page-{i}).",
+            )
+
+    def test_matches_synchronous_build(self):
+        sync_pages = find_pages(self.content, os.path.join(self.root, "sync"))
+        async_pages = find_pages(self.content, os.path.join(self.root, "async"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            sync_deps = generate_pages(sync_pages, self.template)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            async_deps = generate_pages_async(
+                async_pages, self.template, io_concurrency=3
+            )
+        self.assertEqual(sync_deps, async_deps)
+        for (_, sync_file), (_, async_file) in zip(sync_pages, async_pages):
+            self.assertEqual(self.read(sync_file), self.read(async_file))
+        self.assertListEqual(
+            [
+                f"Generating page from {source} to {dest} using {self.template}"
+                for source, dest in async_pages
+            ],
+            output.getvalue().splitlines(),
+        )
+
+    def test_worker_processes_share_settings(self):
+        sync_pages = find_pages(self.content, os.path.join(self.root, "sync"))
+        async_pages = find_pages(self.content, os.path.join(self.root, "async"))
+        search_terms = utils.SEARCH_TERMS
+        utils.SEARCH_TERMS = True
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                sync_deps = generate_pages(sync_pages, self.template)
+                async_deps = generate_pages_async(
+                    async_pages, self.template, workers=2, io_concurrency=2
+                )
+        finally:
+            utils.SEARCH_TERMS = search_terms
+        self.assertIn("terms", async_deps[async_pages[0][0]])
+        self.assertEqual(sync_deps, async_deps)
+
+    def test_persistent_block_cache(self):
+        cache_file = os.path.join(self.root, "cache", "blocks.sqlite3")
+        configure_block_cache(64, cache_file)
+        try:
+            pages = find_pages(self.content, os.path.join(self.root, "public"))
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_pages_async(pages, self.template, io_concurrency=3)
+            self.assertEqual(
+                "<title>Page 0</title><div><h1>Page 0</h1>",
+                self.read(pages[0][1])[:41],
+            )
+        finally:
+            configure_block_cache(0)
+        cache = configure_block_cache(64, cache_file)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_pages_async(pages, self.template, io_concurrency=3)
+            self.assertGreater(cache.stats()["disk_hits"], 0)
+        finally:
+            configure_block_cache(0)
+
+    def test_errors_are_reported(self):
+        self.write(os.path.join(self.content, "dir-1", "page-4.md"), "no title")
+        pages = find_pages(self.content, os.path.join(self.root, "public"))
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            with self.assertRaises(Exception):
+                generate_pages_async(pages, self.template, io_concurrency=2)
+        self.assertIn("page-4.md: Exception: No title found", output.getvalue())
+        self.assertTrue(os.path.exists(pages[-1][1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
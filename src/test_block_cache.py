@@ -0,0 +1,101 @@
+import os
+import sqlite3
+import unittest
+import block_cache
+from fixtures import TempDirTestCase
+from block_cache import BlockCache, block_key
+from deps import DependencyCollector
+from block_markdown import markdown_to_html_fragments, markdown_to_html_node
+
+
+class TestBlockCache(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.root, "cache", "blocks.sqlite3")
+
+    def test_fragments_match_tree(self):
+        md = "# Title\n\nSome **bold** text\n\n* one\n* two\n\n> quote"
+        cache = BlockCache()
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "".join(markdown_to_html_fragments(md, cache.render)),
+        )
+
+    def test_memory_hits(self):
+        cache = BlockCache()
+        self.assertEqual("<p><b>same</b></p>", cache.render("**same**"))
+        self.assertEqual("<p><b>same</b></p>", cache.render("**same**"))
+        self.assertEqual({"hits": 1, "disk_hits": 0, "misses": 1}, cache.stats())
+
+    def test_hits_replay_dependencies(self):
+        cache = BlockCache(path=self.path)
+        cache.render("[a](/a) and `[b](/b)`")
+        cache.close()
+        cache = BlockCache(path=self.path)
+        collector = DependencyCollector()
+        cache.render("[a](/a) and `[b](/b)`", collector)
+        cache.render("![i](/i.png)", collector)
+        cache.render("![i](/i.png)", collector)
+        self.assertEqual({"links": ["/a"], "images": ["/i.png"]}, collector.result())
+        self.assertEqual({"hits": 1, "disk_hits": 1, "misses": 1}, cache.stats())
+        cache.close()
+
+    def test_hits_replay_terms(self):
+        cache = BlockCache(path=self.path)
+        cache.render("1. The **first** step")
+        cache.close()
+        cache = BlockCache(path=self.path)
+        collector = DependencyCollector(terms=True)
+        cache.render("1. The **first** step", collector)
+        cache.render("the end", collector)
+        self.assertDictEqual(
+            {"end": 1, "first": 1, "step": 1, "the": 2}, collector.result()["terms"]
+        )
+        cache.close()
+
+    def test_lru_eviction(self):
+        cache = BlockCache(max_entries=2)
+        cache.render("a")
+        cache.render("b")
+        cache.render("a")
+        cache.render("c")
+        self.assertListEqual(
+            [block_key("a"), block_key("c")], list(cache.entries.keys())
+        )
+
+    def test_disk_store_persists(self):
+        cache = BlockCache(path=self.path)
+        cache.render("# heading")
+        cache.close()
+        cache = BlockCache(path=self.path)
+        self.assertEqual("<h1>heading</h1>", cache.render("# heading"))
+        self.assertEqual({"hits": 0, "disk_hits": 1, "misses": 0}, cache.stats())
+        cache.close()
+
+    def test_disk_store_drops_other_versions(self):
+        cache = BlockCache(path=self.path)
+        cache.render("# heading")
+        cache.close()
+        original = block_cache.CACHE_VERSION
+        block_cache.CACHE_VERSION = original + 1
+        try:
+            cache = BlockCache(path=self.path)
+            cache.render("# heading")
+            self.assertEqual(1, cache.stats()["misses"])
+            cache.close()
+        finally:
+            block_cache.CACHE_VERSION = original
+
+    def test_corrupt_disk_store_is_replaced(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as file:
+            file.write("not a database" * 100)
+        cache = BlockCache(path=self.path)
+        self.assertEqual("<p>text</p>", cache.render("text"))
+        cache.close()
+        with sqlite3.connect(self.path) as db:
+            self.assertEqual(1, db.execute("SELECT COUNT(*) FROM blocks").fetchone()[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,13 @@
+import io
 import unittest
 from block_markdown import (
+    block_to_html,
+    block_to_html_node,
+    extract_title_from_lines,
+    iter_markdown_blocks,
     markdown_to_blocks,
     block_to_block_type,
+    markdown_to_html,
     markdown_to_html_node,
     extract_title,
     BlockType,
@@ -29,6 +35,28 @@ This is a paragraph of text. It has some **bold** and *italic* words inside of i
             blocks,
         )
 
+    def test_iter_markdown_blocks_matches_markdown_to_blocks(self):
+        documents = [
+            "",
+            "\n\n\n",
+            "# heading\n\nparagraph\nstill paragraph",
+            "\nleading newline\n\n\ntrailing odd newlines\n\n\n",
+            "a\n\n\n\nb\n \nc\n\n  indented  \n\n",
+            "* one\n* two\n\n```\ncode\n```\n",
+        ]
+        for markdown in documents:
+            with self.subTest(markdown=markdown):
+                self.assertListEqual(
+                    markdown_to_blocks(markdown),
+                    list(iter_markdown_blocks(io.StringIO(markdown))),
+                )
+
+    def test_extract_title_from_lines(self):
+        lines = io.StringIO("intro\n## Not the title\n# The title\n\ntext\n")
+        self.assertEqual("The title", extract_title_from_lines(lines))
+        with self.assertRaises(Exception):
+            extract_title_from_lines(io.StringIO("#\n##  no title\n"))
+
     def test_block_to_block_types(self):
         block = "# heading"
         self.assertEqual(block_to_block_type(block), BlockType.heading.name)
@@ -43,6 +71,31 @@ This is a paragraph of text. It has some **bold** and *italic* words inside of i
         block = "paragraph"
         self.assertEqual(block_to_block_type(block), BlockType.paragraph.name)
 
+    def test_block_to_block_types_fallback_to_paragraph(self):
+        blocks = [
+            "",
+            "####### seven hashes",
+            "#no space",
+            "```\nnot closed",
+            "> quote\nnot a quote",
+            "* list\nnot a list",
+            "*not a list",
+            "- list\n-",
+            "1. one\n3. three",
+            "2. starts at two",
+        ]
+        for block in blocks:
+            with self.subTest(block=block):
+                self.assertEqual(block_to_block_type(block), BlockType.paragraph.name)
+
+    def test_block_to_block_types_mixed_markers(self):
+        block = "###### h6"
+        self.assertEqual(block_to_block_type(block), BlockType.heading.name)
+        block = "- dash\n* star\n-\ttab"
+        self.assertEqual(block_to_block_type(block), BlockType.unordered_list.name)
+        block = ">quote\n>\n> more"
+        self.assertEqual(block_to_block_type(block), BlockType.quote.name)
+
     def test_paragraph(self):
         md = """
 This is **bolded** paragraph
@@ -126,6 +179,39 @@ this is paragraph text
             "<div><blockquote>This is a blockquote block</blockquote><p>this is paragraph text</p></div>",
         )
 
+    def test_block_to_html_matches_tree(self):
+        blocks = [
+            "A **bold** and *italic* [link](/a) with `code` ![img](/i.png)",
+            "Tom & Jerry <3 [q](/s?a=1&b=\"2\") ![it's](/i.png)",
+            "### heading with *style*",
+            "```\nplain code\n```",
+            "> quoted **text**\n> second line",
+            "* one\n- two *x*",
+            "1. first\n2. [second](/b)",
+            "not\na list",
+        ]
+        for block in blocks:
+            with self.subTest(block=block):
+                self.assertEqual(
+                    block_to_html_node(block).to_html(), block_to_html(block)
+                )
+
+    def test_code_block_is_escaped(self):
+        block = "```\nif a < b && c > d:\n```"
+        html = "<pre><code>if a &lt; b &amp;&amp; c &gt; d:\n</code></pre>"
+        self.assertEqual(html, block_to_html(block))
+        self.assertEqual(html, block_to_html_node(block).to_html())
+
+    def test_code_block_is_verbatim(self):
+        block = "```\nx = **y** + [a](b)\n```"
+        html = "<pre><code>x = **y** + [a](b)\n</code></pre>"
+        self.assertEqual(html, block_to_html(block))
+        self.assertEqual(html, block_to_html_node(block).to_html())
+
+    def test_markdown_to_html(self):
+        md = "# Title\n\nSome *text*\n\n* a\n* b"
+        self.assertEqual(markdown_to_html_node(md).to_html(), markdown_to_html(md))
+
     def test_extract_title(self):
         md = """
 # This is a title
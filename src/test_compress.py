@@ -0,0 +1,79 @@
+import gzip
+import os
+import unittest
+from fixtures import TempDirTestCase
+from compress import (
+    compress_outputs,
+    compressed_siblings,
+    compressed_suffixes,
+    minify_assets,
+    remove_compressed,
+)
+from writer import OutputWriter
+
+
+class TestCompressOutputs(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.public = os.path.join(self.root, "public")
+        self.manifest = os.path.join(self.root, "cache", "compress.json")
+        os.makedirs(os.path.join(self.public, "blog"))
+        self.page = os.path.join(self.public, "blog", "index.html")
+        self.write(self.page, "<p>hello</p>" * 50)
+        self.write(os.path.join(self.public, "logo.png"), "not text")
+
+    def test_writes_gzip_siblings(self):
+        self.assertEqual((1, 0, 0), compress_outputs(self.public, self.manifest))
+        with gzip.open(self.page + ".gz", "rt") as file:
+            self.assertEqual("<p>hello</p>" * 50, file.read())
+        self.assertFalse(os.path.exists(os.path.join(self.public, "logo.png.gz")))
+
+    def test_skips_unchanged_outputs(self):
+        compress_outputs(self.public, self.manifest)
+        os.utime(self.page + ".gz", ns=(1, 1))
+        self.assertEqual((0, 1, 0), compress_outputs(self.public, self.manifest))
+        self.assertEqual(1, os.stat(self.page + ".gz").st_mtime_ns)
+        self.write(self.page, "<p>changed</p>")
+        self.assertEqual((1, 0, 0), compress_outputs(self.public, self.manifest))
+        with gzip.open(self.page + ".gz", "rt") as file:
+            self.assertEqual("<p>changed</p>", file.read())
+
+    def test_missing_sibling_is_rewritten(self):
+        compress_outputs(self.public, self.manifest)
+        os.remove(self.page + ".gz")
+        self.assertEqual((1, 0, 0), compress_outputs(self.public, self.manifest))
+        self.assertTrue(os.path.exists(self.page + ".gz"))
+
+    def test_removes_stale_siblings(self):
+        compress_outputs(self.public, self.manifest)
+        os.remove(self.page)
+        _, _, removed = compress_outputs(self.public, self.manifest)
+        self.assertGreaterEqual(removed, 1)
+        self.assertFalse(os.path.exists(self.page + ".gz"))
+
+    def test_remove_compressed(self):
+        compress_outputs(self.public, self.manifest)
+        self.assertIn(
+            self.page + ".gz", compressed_siblings(self.public, self.manifest)
+        )
+        removed = remove_compressed(self.public, self.manifest)
+        self.assertEqual(len(compressed_suffixes()), removed)
+        self.assertListEqual(["index.html"], os.listdir(os.path.dirname(self.page)))
+        self.assertListEqual([], compressed_siblings(self.public, self.manifest))
+
+    def test_minify_assets_replaces_hardlinks(self):
+        source = os.path.join(self.root, "index.css")
+        self.write(source, "body {\n  color: red;\n}\n")
+        dest = os.path.join(self.public, "index.css")
+        os.link(source, dest)
+        writer = OutputWriter(minify=True)
+        self.assertEqual(1, minify_assets(self.public, writer))
+        with open(dest) as file:
+            self.assertEqual("body{color:red}", file.read())
+        with open(source) as file:
+            self.assertEqual("body {\n  color: red;\n}\n", file.read())
+        self.assertEqual(0, minify_assets(self.public, writer))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+from ast_cache import configure_ast_cache
+from block_cache import configure_block_cache
+from deps import DependencyIndex, page_url, resolve_url
+from template import Template
+from utils import render_page
+
+
+def page_dependencies(body):
+    _, result = render_page(f"# Page\n\n{body}", Template("{{ Content }}"))
+    return {"links": result["links"], "images": result["images"]}
+
+
+class TestDependencies(unittest.TestCase):
+    def test_collect_dependencies(self):
+        md = "[home](/) and ![pic](/images/a.png) then [home](/) and [out](https://x.y)"
+        self.assertEqual(
+            {"links": ["/", "https://x.y"], "images": ["/images/a.png"]},
+            page_dependencies(md),
+        )
+
+    def test_code_is_not_a_dependency(self):
+        md = "Use `[text](url)` here\n\n```\n![alt](missing.png)\n```\n\n[real](/r)"
+        self.assertEqual({"links": ["/r"], "images": []}, page_dependencies(md))
+
+    def test_cached_renders_collect_the_same(self):
+        md = "[a](/a) `[b](/b)`\n\n- ![i](/i.png)\n\n> [q](/q)"
+        expected = page_dependencies(md)
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                configure_block_cache(16)
+                self.assertEqual(expected, page_dependencies(md))
+                self.assertEqual(expected, page_dependencies(md))
+                configure_block_cache(0)
+                configure_ast_cache(os.path.join(tmp, "ast.sqlite3"))
+                self.assertEqual(expected, page_dependencies(md))
+                self.assertEqual(expected, page_dependencies(md))
+            finally:
+                configure_block_cache(0)
+                configure_ast_cache(None)
+
+    def test_page_url(self):
+        self.assertEqual(
+            "/blog/post.html",
+            page_url(os.path.join("public", "blog", "post.html"), "public"),
+        )
+
+    def test_resolve_url(self):
+        self.assertEqual("/majesty", resolve_url("/index.html", "/majesty"))
+        self.assertEqual("/blog/b.html", resolve_url("/blog/a.html", "b.html#top"))
+        self.assertEqual("/img.png", resolve_url("/blog/a.html", "../img.png"))
+        self.assertEqual("/blog/", resolve_url("/blog/a.html", "./"))
+        self.assertIsNone(resolve_url("/index.html", "https://boot.dev"))
+        self.assertIsNone(resolve_url("/index.html", "mailto:me@example.com"))
+        self.assertIsNone(resolve_url("/index.html", "#section"))
+
+
+class TestDependencyIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = DependencyIndex()
+        self.index.record(
+            "content/index.md",
+            "/index.html",
+            "template.html",
+            {"links": ["/blog/post"], "images": ["/images/a.png"]},
+        )
+        self.index.record(
+            "content/blog/post.md",
+            "/blog/post.html",
+            "template.html",
+            {"links": ["/", "missing.html"], "images": []},
+        )
+
+    def test_dependents(self):
+        self.assertSetEqual(
+            {"content/index.md", "content/blog/post.md"},
+            self.index.dependents("template.html"),
+        )
+        self.assertSetEqual(
+            {"content/index.md"}, self.index.dependents("/images/a.png")
+        )
+        self.assertSetEqual(set(), self.index.dependents("/images/b.png"))
+
+    def test_remove_updates_reverse_index(self):
+        self.index.dependents("template.html")
+        self.index.remove("content/index.md")
+        self.assertSetEqual(
+            {"content/blog/post.md"}, self.index.dependents("template.html")
+        )
+
+    def test_broken_links(self):
+        targets = {"/index.html", "/blog/post.html", "/images/a.png"}
+        self.assertListEqual(
+            [("content/blog/post.md", "missing.html")],
+            self.index.broken_links(targets),
+        )
+
+    def test_changed_assets_and_persistence(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            static = os.path.join(tmp, "static")
+            os.makedirs(os.path.join(static, "images"))
+            image = os.path.join(static, "images", "a.png")
+            with open(image, "w") as file:
+                file.write("png")
+            self.assertSetEqual({"/images/a.png"}, self.index.changed_assets(static))
+            self.index.update_assets(static)
+            self.assertSetEqual(set(), self.index.changed_assets(static))
+            path = os.path.join(tmp, "deps.json")
+            self.index.save(path)
+            loaded = DependencyIndex.load(path)
+            self.assertEqual(self.index.pages, loaded.pages)
+            os.utime(image, ns=(1, 1))
+            self.assertSetEqual({"/images/a.png"}, loaded.changed_assets(static))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
+import io
 import unittest
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import HTMLNode, LeafNode, ParentNode, escape_attribute, escape_text
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -108,6 +109,79 @@ class TestHTMLNode(unittest.TestCase):
             "<h2><b>Bold text</b>Normal text<i>italic text</i>Normal text</h2>",
         )
 
+    def test_iter_html_matches_to_html(self):
+        node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode("b", "Bold"), LeafNode(None, " text")]),
+                LeafNode("a", "link", {"href": "/"}),
+            ],
+            {"class": "page"},
+        )
+        self.assertEqual(
+            [
+                '<div class="page">',
+                "<p>",
+                "<b>Bold</b>",
+                " text",
+                "</p>",
+                '<a href="/">link</a>',
+                "</div>",
+            ],
+            list(node.iter_html()),
+        )
+        self.assertEqual("".join(node.iter_html()), node.to_html())
+
+    def test_write_html(self):
+        node = ParentNode("ul", [ParentNode("li", [LeafNode(None, "item")])])
+        buffer = io.StringIO()
+        node.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), "<ul><li>item</li></ul>")
+
+    def test_to_html_deep_nesting(self):
+        node = LeafNode(None, "deep")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span><span>"))
+        self.assertEqual(html.count("deep"), 1)
+
+    def test_to_html_nested_missing_children(self):
+        node = ParentNode("div", [ParentNode("p", None)])
+        with self.assertRaises(ValueError):
+            node.to_html()
+
+    def test_escape_text(self):
+        self.assertEqual(
+            "if a &lt; b &amp;&amp; c &gt; d", escape_text("if a < b && c > d")
+        )
+        self.assertEqual("say \"hi\" it's", escape_text("say \"hi\" it's"))
+        text = "nothing to escape"
+        self.assertIs(text, escape_text(text))
+
+    def test_escape_attribute(self):
+        self.assertEqual(
+            "/q?a=1&amp;b=&quot;2&quot;&#x27;&lt;&gt;",
+            escape_attribute("/q?a=1&b=\"2\"'<>"),
+        )
+
+    def test_leaf_escapes_value_and_props(self):
+        node = LeafNode("a", "<b> & co", {"href": '/x?y="1"&z'})
+        self.assertEqual(
+            '<a href="/x?y=&quot;1&quot;&amp;z">&lt;b&gt; &amp; co</a>', node.to_html()
+        )
+        self.assertEqual("1 &lt; 2", LeafNode(None, "1 < 2").to_html())
+
+    def test_slots(self):
+        for node in (
+            HTMLNode("p", "text"),
+            LeafNode(None, "text"),
+            ParentNode("div", []),
+        ):
+            self.assertFalse(hasattr(node, "__dict__"))
+            with self.assertRaises(AttributeError):
+                node.unknown = "value"
+
 
 if __name__ == "__main__":
     unittest.main()
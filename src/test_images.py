@@ -0,0 +1,114 @@
+import io
+import os
+import struct
+import unittest
+from contextlib import redirect_stdout
+from fixtures import TempDirTestCase
+from images import Image, build_images, image_attributes, image_size, variant_path
+from textnode import TextNode, set_image_attributes, text_node_to_html
+
+
+def write_png_header(path, width, height):
+    with open(path, "wb") as file:
+        file.write(b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR")
+        file.write(struct.pack(">II", width, height) + b"\x08\x02\x00\x00\x00")
+
+
+class TestImages(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.root, "static")
+        os.makedirs(os.path.join(self.static, "images"))
+
+    def tearDown(self):
+        super().tearDown()
+        set_image_attributes({})
+
+    def test_image_size(self):
+        path = os.path.join(self.static, "a.png")
+        write_png_header(path, 640, 480)
+        self.assertEqual((640, 480), image_size(path))
+        with open(path, "wb") as file:
+            file.write(b"GIF89a" + struct.pack("<HH", 3, 2))
+        self.assertEqual((3, 2), image_size(path))
+        with open(path, "wb") as file:
+            file.write(b"\xff\xd8\xff\xe0\x00\x04ab\xff\xc0\x00\x11\x08")
+            file.write(struct.pack(">HH", 20, 30))
+        self.assertEqual((30, 20), image_size(path))
+
+    def test_image_attributes(self):
+        info = {"width": 1000, "height": 500, "variants": [[480, 240, "x"]]}
+        self.assertDictEqual(
+            {
+                "width": "1000",
+                "height": "500",
+                "srcset": "/i/a-480w.png 480w, /i/a.png 1000w",
+                "sizes": "(max-width: 1000px) 100vw, 1000px",
+            },
+            image_attributes("/i/a.png", info),
+        )
+        self.assertEqual("images/a-480w.jpg", variant_path("images/a.jpg", 480))
+
+    def test_rendered_attributes(self):
+        set_image_attributes({"/a.png": {"width": "10", "height": "5"}})
+        self.assertEqual(
+            '<img src="/a.png" alt="A" width="10" height="5"></img>',
+            text_node_to_html(TextNode("A", "image", "/a.png")),
+        )
+
+    @unittest.skipIf(Image is not None, "sizes come from Pillow when it is installed")
+    def test_build_images_without_pillow(self):
+        write_png_header(os.path.join(self.static, "images", "a.png"), 640, 480)
+        manifest = os.path.join(self.root, "cache", "images.json")
+        cache_dir = os.path.join(self.root, "cache", "images")
+        public = os.path.join(self.root, "public")
+        with redirect_stdout(io.StringIO()) as output:
+            attributes = build_images(self.static, public, manifest, cache_dir)
+            build_images(self.static, public, manifest, cache_dir)
+        self.assertDictEqual(
+            {"/images/a.png": {"width": "640", "height": "480"}}, attributes
+        )
+        self.assertEqual(1, output.getvalue().count("Processing 1 image(s)"))
+
+    @unittest.skipUnless(Image, "variants need Pillow")
+    def test_build_images_with_pillow(self):
+        Image.new("RGB", (1200, 600), "red").save(
+            os.path.join(self.static, "images", "a.png")
+        )
+        Image.new("RGB", (300, 200), "blue").save(
+            os.path.join(self.static, "images", "b.jpg")
+        )
+        manifest = os.path.join(self.root, "cache", "images.json")
+        cache_dir = os.path.join(self.root, "cache", "images")
+        public = os.path.join(self.root, "public")
+        with redirect_stdout(io.StringIO()) as output:
+            attributes = build_images(self.static, public, manifest, cache_dir)
+        self.assertIn("Processing 2 image(s)", output.getvalue())
+        self.assertDictEqual(
+            {
+                "/images/a.png": {
+                    "width": "1200",
+                    "height": "600",
+                    "srcset": "/images/a-480w.png 480w, /images/a-960w.png 960w, "
+                    "/images/a.png 1200w",
+                    "sizes": "(max-width: 1200px) 100vw, 1200px",
+                },
+                "/images/b.jpg": {"width": "300", "height": "200"},
+            },
+            attributes,
+        )
+        variants = sorted(os.listdir(os.path.join(public, "images")))
+        self.assertListEqual(["a-480w.png", "a-960w.png"], variants)
+        variant = os.path.join(public, "images", "a-480w.png")
+        with Image.open(variant) as image:
+            self.assertEqual((480, 240), image.size)
+        cached = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir)]
+        self.assertTrue(any(os.path.samefile(variant, path) for path in cached))
+        with redirect_stdout(io.StringIO()) as output:
+            again = build_images(self.static, public, manifest, cache_dir)
+        self.assertNotIn("Processing", output.getvalue())
+        self.assertDictEqual(attributes, again)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import contextlib
+import io
+import os
+import unittest
+from fixtures import TempDirTestCase
+from utils import generate_pages_incremental
+
+
+class TestIncrementalBuild(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.public = os.path.join(self.root, "public")
+        self.static = os.path.join(self.root, "static")
+        self.template = os.path.join(self.root, "template.html")
+        self.manifest = os.path.join(self.root, "cache", "manifest.json")
+        self.deps = os.path.join(self.root, "cache", "deps.json")
+        os.makedirs(self.static)
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[a](/blog/a)")
+        self.write(os.path.join(self.content, "blog", "a.md"), "# A")
+        self.write(os.path.join(self.content, "blog", "b.md"), "# B")
+
+    def build(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            generate_pages_incremental(
+                self.content,
+                self.template,
+                self.public,
+                self.manifest,
+                static_path=self.static,
+                deps_file=self.deps,
+            )
+        generated = [
+            os.path.relpath(line.split(" ")[3], self.content)
+            for line in output.getvalue().splitlines()
+            if line.startswith("Generating page from ")
+        ]
+        return generated, output.getvalue()
+
+    def test_only_changed_pages_are_rendered(self):
+        pages = ["blog/a.md", "blog/b.md", "index.md"]
+        self.assertListEqual(pages, self.build()[0])
+        self.assertListEqual([], self.build()[0])
+        self.write(os.path.join(self.content, "blog", "a.md"), "# A again")
+        os.remove(os.path.join(self.content, "blog", "b.md"))
+        generated, output = self.build()
+        self.assertListEqual(["blog/a.md"], generated)
+        self.assertIn("1 page(s) generated, 1 unchanged", output)
+        page = self.read(os.path.join(self.public, "blog", "a.html"))
+        self.assertIn("<title>A again</title>", page)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog", "b.html")))
+        self.assertListEqual(["a.html"], os.listdir(os.path.join(self.public, "blog")))
+
+    def test_template_change_renders_every_page(self):
+        self.build()
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertListEqual(["blog/a.md", "blog/b.md", "index.md"], self.build()[0])
+        self.assertTrue(
+            self.read(os.path.join(self.public, "index.html")).startswith("<h1>Home")
+        )
+        self.assertListEqual([], self.build()[0])
+
+    def test_missing_output_is_rendered_again(self):
+        self.build()
+        os.remove(os.path.join(self.public, "index.html"))
+        self.assertListEqual(["index.md"], self.build()[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
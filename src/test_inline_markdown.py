@@ -1,3 +1,4 @@
+import random
 import unittest
 from textnode import TextNode, TextType
 from inline_markdown import (
@@ -7,6 +8,7 @@ from inline_markdown import (
     split_nodes_image,
     split_nodes_link,
     text_to_textnodes,
+    text_to_textnodes_legacy,
 )
 
 
@@ -215,6 +217,67 @@ class TextInlineMarkdown(unittest.TestCase):
             new_nodes,
         )
 
+    def test_text_to_textnodes_matches_legacy(self):
+        texts = [
+            "",
+            "plain text only",
+            "**bold** at the start and *italic* at the end",
+            "This is **text** with an *italic* word and a `code block`",
+            "![image](https://i.imgur.com/zjjcJKZ.png)[link](https://boot.dev)",
+            "a ![first](/a.png) b ![second](/b.png) c [one](/1) d [two](/2) e",
+            "**bold with [link](/x) inside** then [link](/y)",
+            "`code with [brackets](/z)` after",
+            "adjacent **bold****bold** and empty ** ** markers",
+            "an ! and a [ that never close",
+            "[![build](/badge.svg)](/ci)",
+            "see [the *docs*](/docs)",
+            "[link `x`](y)",
+            "**[bold link](/b)** and [a **bold** word](/c)",
+            "![x](/a.png) and ![x](/a.png) twice",
+        ]
+        for text in texts:
+            with self.subTest(text=text):
+                self.assertListEqual(
+                    text_to_textnodes_legacy(text), text_to_textnodes(text)
+                )
+
+    def test_text_to_textnodes_matches_legacy_randomly(self):
+        rng = random.Random(0)
+        pieces = ["a", " ", "*", "**", "`", "[", "]", "(", ")", "!", "![x](/i)"]
+        pieces += ["[l](/u)", "\n"]
+        for _ in range(5000):
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+            try:
+                expected = text_to_textnodes_legacy(text)
+            except ValueError:
+                continue
+            self.assertListEqual(expected, text_to_textnodes(text), text)
+
+    def test_text_to_textnodes_many_links(self):
+        text = " ".join(f"w [l{i % 7}](/u) ![i](/p.png)" for i in range(2000))
+        self.assertListEqual(text_to_textnodes_legacy(text), text_to_textnodes(text))
+
+    def test_text_to_textnodes_unbalanced_code_span(self):
+        self.assertListEqual(
+            [
+                TextNode("a ", TextType.text.name),
+                TextNode("x * y", TextType.code.name),
+            ],
+            text_to_textnodes("a `x * y`"),
+        )
+
+    def test_text_to_textnodes_legacy_flag(self):
+        text = "This is **text** with a [link](https://boot.dev)"
+        self.assertListEqual(
+            text_to_textnodes_legacy(text), text_to_textnodes(text, legacy=True)
+        )
+
+    def test_text_to_textnodes_unclosed(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes("This is **not closed")
+        with self.assertRaises(ValueError):
+            text_to_textnodes("This is `not closed")
+
 
 if __name__ == "__main__":
     unittest.main()
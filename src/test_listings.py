@@ -0,0 +1,130 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from listings import (
+    collect_listings,
+    generate_listings,
+    paginate,
+    remove_listings,
+    slugify,
+    tag_slugs,
+)
+from metadata import SiteIndex
+
+
+def make_site(count):
+    site = SiteIndex()
+    for i in range(1, count + 1):
+        site.record(
+            f"content/blog/p{i}.md",
+            f"/blog/p{i}.html",
+            {"title": f"Post {i}", "date": f"2024-01-0{i}", "tags": ["News"]},
+        )
+    site.record("content/index.md", "/index.html", {"title": "Home", "tags": []})
+    return site
+
+
+class TestListings(unittest.TestCase):
+    def test_slugify(self):
+        self.assertEqual("big-stuff", slugify("Big Stuff!"))
+        self.assertEqual("untitled", slugify("!!"))
+
+    def test_tag_slugs(self):
+        with redirect_stdout(io.StringIO()) as output:
+            slugs = tag_slugs(["C++", "C", "C#", "Go"])
+        self.assertEqual("c", slugs["C"])
+        self.assertEqual("go", slugs["Go"])
+        self.assertRegex(slugs["C++"], r"^c-[0-9a-f]{8}$")
+        self.assertEqual(4, len(set(slugs.values())))
+        self.assertEqual(2, output.getvalue().count("shares the slug 'c'"))
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(slugs["C++"], tag_slugs(["C++", "C"])["C++"])
+
+    def test_paginate(self):
+        listings = paginate("Archive", "archive", list(range(5)), 2)
+        self.assertListEqual(
+            ["/archive/index.html", "/archive/page-2.html", "/archive/page-3.html"],
+            [listing["url"] for listing in listings],
+        )
+        self.assertListEqual([4], listings[2]["entries"])
+        self.assertIsNone(listings[0]["newer"])
+        self.assertEqual("/archive/page-2.html", listings[0]["older"])
+        self.assertIsNone(listings[2]["older"])
+
+    def test_collect_listings(self):
+        listings = collect_listings(make_site(3), 2)
+        urls = [listing["url"] for listing in listings]
+        self.assertListEqual(
+            [
+                "/archive/index.html",
+                "/archive/page-2.html",
+                "/tags/news/index.html",
+                "/tags/news/page-2.html",
+                "/blog/index.html",
+                "/blog/page-2.html",
+            ],
+            urls,
+        )
+        self.assertListEqual(
+            ["Post 3", "Post 2"], [entry["title"] for entry in listings[0]["entries"]]
+        )
+
+    def test_authored_index_wins(self):
+        site = make_site(1)
+        site.record(
+            "content/blog/index.md", "/blog/index.html", {"title": "Blog", "tags": []}
+        )
+        urls = [listing["url"] for listing in collect_listings(site)]
+        self.assertNotIn("/blog/index.html", urls)
+
+    def test_content_directory_keeps_its_listing(self):
+        site = make_site(1)
+        site.record(
+            "content/archive/old.md", "/archive/old.html", {"title": "Old", "tags": []}
+        )
+        with redirect_stdout(io.StringIO()) as output:
+            listings = collect_listings(site)
+        archive = [item for item in listings if item["url"] == "/archive/index.html"]
+        self.assertEqual(1, len(archive))
+        self.assertEqual("archive", archive[0]["title"])
+        self.assertIn("Skipping listing 'Archive'", output.getvalue())
+
+    def test_remove_listings(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            template = os.path.join(tmp, "template.html")
+            with open(template, "w") as file:
+                file.write("{{ Content }}")
+            public = os.path.join(tmp, "public")
+            manifest = os.path.join(tmp, "cache", "listings.json")
+            site = make_site(2)
+            with redirect_stdout(io.StringIO()):
+                generate_listings(site, template, public, manifest)
+                self.assertEqual(3, remove_listings(site, public, manifest))
+            self.assertListEqual([], os.listdir(public))
+            self.assertFalse(os.path.exists(manifest))
+
+    def test_generate_listings_incrementally(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            template = os.path.join(tmp, "template.html")
+            with open(template, "w") as file:
+                file.write("<title>{{ Title }}</title>{{ Content }}")
+            public = os.path.join(tmp, "public")
+            manifest = os.path.join(tmp, "cache", "listings.json")
+            site = make_site(3)
+            args = (template, public, manifest, 2)
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual((6, 0), generate_listings(site, *args))
+                self.assertEqual((0, 6), generate_listings(site, *args))
+                site.remove("content/blog/p1.md")
+                # Only the archive's first page keeps the same members.
+                self.assertEqual((3, 1), generate_listings(site, *args))
+            tags_page = os.path.join(public, "tags", "news", "page-2.html")
+            self.assertFalse(os.path.exists(tags_page))
+            with open(os.path.join(public, "archive", "page-2.html")) as file:
+                self.assertIn('<a href="/index.html">Home</a>', file.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import unittest
+from fixtures import TempDirTestCase
+from manifest import hash_file, load_manifest, save_manifest, source_entry
+
+
+class TestManifest(TempDirTestCase):
+    def write(self, name, content):
+        return super().write(os.path.join(self.root, name), content)
+
+    def test_hash_file(self):
+        path = self.write("a.md", "# Title")
+        other = self.write("b.md", "# Title")
+        self.assertEqual(hash_file(path), hash_file(other))
+        self.write("b.md", "# Other title")
+        self.assertNotEqual(hash_file(path), hash_file(other))
+
+    def test_load_missing_manifest(self):
+        manifest = load_manifest(os.path.join(self.root, "missing.json"))
+        self.assertEqual(manifest, {"template": None, "pages": {}})
+
+    def test_load_corrupt_manifest(self):
+        path = self.write("manifest.json", "{not json")
+        self.assertEqual(load_manifest(path), {"template": None, "pages": {}})
+
+    def test_save_and_load(self):
+        path = os.path.join(self.root, "cache", "manifest.json")
+        manifest = {"template": "abc", "pages": {"a.md": {"hash": "123"}}}
+        save_manifest(manifest, path)
+        self.assertEqual(load_manifest(path), manifest)
+
+    def test_source_entry_reuses_hash_when_stat_matches(self):
+        path = self.write("a.md", "# Title")
+        entry = source_entry(path, None, "a.html")
+        self.assertEqual(entry["hash"], hash_file(path))
+        self.assertEqual(entry["dest"], "a.html")
+        cached = dict(entry, hash="cached")
+        self.assertEqual(source_entry(path, cached, "a.html")["hash"], "cached")
+
+    def test_source_entry_rehashes_changed_file(self):
+        path = self.write("a.md", "# Title")
+        entry = source_entry(path, None, "a.html")
+        self.write("a.md", "# A longer title")
+        self.assertNotEqual(source_entry(path, entry, "a.html")["hash"], entry["hash"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import io
+import os
+import tempfile
+import unittest
+from metadata import (
+    SiteIndex,
+    parse_page,
+    read_front_matter,
+    split_front_matter,
+    template_fields,
+    title_from_blocks,
+)
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_split_front_matter(self):
+        md = "---\ntitle: Hello\ndate: 2024-01-02\ntags: [a, b]\n---\n# Heading\n"
+        front_matter, body = split_front_matter(md)
+        self.assertDictEqual(
+            {"title": "Hello", "date": "2024-01-02", "tags": ["a", "b"]}, front_matter
+        )
+        self.assertEqual("# Heading\n", body)
+
+    def test_no_front_matter(self):
+        for md in ("# Title\n", "---\ntitle: unterminated\n", "---\nx: y\n----\n"):
+            with self.subTest(md=md):
+                self.assertEqual(({}, md), split_front_matter(md))
+
+    def test_invalid_line(self):
+        with self.assertRaises(ValueError):
+            split_front_matter("---\njust text\n---\n")
+
+    def test_read_front_matter(self):
+        file = io.StringIO("---\ntags: x\n---\n# Title\n")
+        self.assertEqual({"tags": ["x"]}, read_front_matter(file))
+        self.assertEqual("# Title\n", file.read())
+        file = io.StringIO("# Title\n\nbody\n")
+        self.assertEqual({}, read_front_matter(file))
+        self.assertEqual("# Title\n\nbody\n", file.read())
+
+    def test_unterminated_front_matter_is_rewound(self):
+        text = "---\nnot: front matter\n" + "line\n" * 1000
+        file = io.StringIO(text)
+        self.assertEqual({}, read_front_matter(file))
+        self.assertEqual(text, file.read())
+
+
+class TestParsePage(unittest.TestCase):
+    def test_title_from_blocks(self):
+        blocks = ["## sub", "intro\n# The title", "# Later"]
+        self.assertEqual("The title", title_from_blocks(blocks))
+        with self.assertRaises(Exception):
+            title_from_blocks(["#no space", "## sub"])
+
+    def test_parse_page(self):
+        metadata, blocks = parse_page("---\ndate: 2024-01-02\n---\n# Title\n\ntext")
+        self.assertDictEqual(
+            {"date": "2024-01-02", "title": "Title", "tags": []}, metadata
+        )
+        self.assertListEqual(["# Title", "text"], blocks)
+
+    def test_front_matter_title_wins(self):
+        metadata, _ = parse_page("---\ntitle: Given\n---\ntext only")
+        self.assertEqual("Given", metadata["title"])
+
+    def test_template_fields(self):
+        fields = template_fields({"title": "A < B", "tags": ["x", "y"]})
+        self.assertDictEqual({"Title": "A &lt; B", "Tags": "x, y"}, fields)
+
+
+class TestSiteIndex(unittest.TestCase):
+    def test_queries_and_persistence(self):
+        site = SiteIndex()
+        site.record("a.md", "/a.html", {"title": "A", "date": "2024-01", "tags": ["x"]})
+        site.record("b.md", "/b.html", {"title": "B", "date": "2024-02", "tags": []})
+        site.record("c.md", "/c.html", {"title": "C", "tags": ["x", "y"]})
+        self.assertListEqual(
+            ["b.md", "a.md", "c.md"], [source for source, _ in site.by_date()]
+        )
+        self.assertDictEqual({"x": ["a.md", "c.md"], "y": ["c.md"]}, site.tags())
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache", "site.json")
+            site.save(path)
+            loaded = SiteIndex.load(path)
+        self.assertDictEqual(site.pages, loaded.pages)
+        loaded.remove("a.md")
+        self.assertListEqual(["b.md", "c.md"], sorted(loaded.pages))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from minify import minify_css, minify_html
+
+
+class TestMinifyHtml(unittest.TestCase):
+    def test_strips_layout_whitespace(self):
+        html = "<html>\n  <body>\n    <p>a <b>b</b> c</p>\n  </body>\n</html>\n"
+        self.assertEqual(
+            "<html><body><p>a <b>b</b> c</p></body></html>", minify_html(html)
+        )
+
+    def test_newlines_in_text_become_spaces(self):
+        self.assertEqual("<p>one two</p>", minify_html("<p>one\n   two</p>"))
+
+    def test_keeps_raw_elements(self):
+        html = (
+            "<div>\n<pre><code>x\n  y</code></pre>\n"
+            "<textarea>\n a</textarea>\n</div>"
+        )
+        self.assertEqual(
+            "<div><pre><code>x\n  y</code></pre><textarea>\n a</textarea></div>",
+            minify_html(html),
+        )
+
+    def test_drops_comments(self):
+        html = "<p>a</p>\n<!-- note -->\n<!--[if IE]>x<![endif]-->"
+        self.assertEqual("<p>a</p><!--[if IE]>x<![endif]-->", minify_html(html))
+
+
+class TestMinifyCss(unittest.TestCase):
+    def test_strips_whitespace_and_comments(self):
+        css = "/* theme */\nbody {\n  color: #fff;\n  margin: 0 auto;\n}\n"
+        css += "a > b, i { x: 1 }\n"
+        self.assertEqual("body{color:#fff;margin:0 auto}a>b,i{x:1}", minify_css(css))
+
+    def test_keeps_strings_and_selector_spaces(self):
+        css = 'a :hover { content: "a  /* b */ ;" }'
+        self.assertEqual('a :hover{content:"a  /* b */ ;"}', minify_css(css))
+
+
+if __name__ == "__main__":
+    unittest.main()
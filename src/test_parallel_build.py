@@ -0,0 +1,56 @@
+import contextlib
+import io
+import os
+import unittest
+from fixtures import TempDirTestCase
+from utils import find_pages, generate_pages, generate_pages_parallel
+
+
+class TestParallelBuild(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        for i in range(12):
+            self.write(
+                os.path.join(self.content, f"dir-{i % 3}", f"page-{i}.md"),
+                f"# Page {i}\n\nSome **text** with a [link](/dir-0/page-{i}).",
+            )
+
+    def test_matches_serial_build(self):
+        serial_pages = find_pages(self.content, os.path.join(self.root, "serial"))
+        parallel_pages = find_pages(self.content, os.path.join(self.root, "parallel"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            serial_deps = generate_pages(serial_pages, self.template)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            parallel_deps = generate_pages_parallel(
+                parallel_pages, self.template, workers=3
+            )
+        self.assertEqual(serial_deps, parallel_deps)
+        for (_, serial_file), (_, parallel_file) in zip(serial_pages, parallel_pages):
+            self.assertEqual(self.read(serial_file), self.read(parallel_file))
+        self.assertListEqual(
+            [
+                f"Generating page from {source} to {dest} using {self.template}"
+                for source, dest in parallel_pages
+            ],
+            output.getvalue().splitlines(),
+        )
+
+    def test_errors_are_collected(self):
+        self.write(os.path.join(self.content, "dir-1", "page-4.md"), "no title")
+        self.write(os.path.join(self.content, "dir-2", "page-5.md"), "no title")
+        pages = find_pages(self.content, os.path.join(self.root, "public"))
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            with self.assertRaisesRegex(Exception, "2 page"):
+                generate_pages_parallel(pages, self.template, workers=2)
+        self.assertIn("page-4.md: Exception: No title found", output.getvalue())
+        self.assertIn("page-5.md: Exception: No title found", output.getvalue())
+        self.assertTrue(os.path.exists(pages[-1][1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import http.client
+import os
+import threading
+import unittest
+from fixtures import TempDirTestCase
+from preview import PreviewSite, etag_matches, preview, url_to_relative
+
+
+class TestPreview(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.template = os.path.join(self.root, "template.html")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+
+    def test_url_to_relative(self):
+        self.assertEqual("", url_to_relative("/"))
+        self.assertEqual("blog/", url_to_relative("/blog/?q=1"))
+        self.assertEqual("a b.html", url_to_relative("/a%20b.html"))
+        self.assertEqual("index.css", url_to_relative("/../index.css"))
+
+    def test_etag_matches(self):
+        self.assertTrue(etag_matches('"a", "b"', '"b"'))
+        self.assertTrue(etag_matches('W/"b"', '"b"'))
+        self.assertTrue(etag_matches("*", '"b"'))
+        self.assertFalse(etag_matches('"a"', '"b"'))
+        self.assertFalse(etag_matches(None, '"b"'))
+
+    def test_resolves_pages_and_static_files(self):
+        site = PreviewSite(self.content, self.template, self.static)
+        pages = [("/", "Home"), ("/blog", "Blog"), ("/blog/post.html", "Post")]
+        for url, title in pages:
+            content_type, body, _ = site.resolve(url)
+            self.assertEqual("text/html; charset=utf-8", content_type)
+            self.assertIn(f"<title>{title}</title>".encode(), body)
+        content_type, path, _ = site.resolve("/index.css")
+        self.assertEqual("text/css", content_type)
+        self.assertEqual(os.path.join(self.static, "index.css"), path)
+        self.assertIsNone(site.resolve("/missing.html"))
+
+    def test_cache_is_invalidated_by_mtime(self):
+        site = PreviewSite(self.content, self.template, self.static)
+        post = os.path.join(self.content, "blog", "post.md")
+        _, _, etag = site.resolve("/blog/post.html")
+        self.assertEqual(etag, site.resolve("/blog/post.html")[2])
+        self.assertEqual((1, 1), (site.renders, site.hits))
+        self.write(post, "# Edit", os.stat(post).st_mtime_ns + 10**9)
+        _, body, new_etag = site.resolve("/blog/post.html")
+        self.assertIn(b"<h1>Edit</h1>", body)
+        self.assertNotEqual(etag, new_etag)
+        self.write(self.template, "{{ Content }}", 10**18)
+        self.assertNotIn(b"<title>", site.resolve("/blog/post.html")[1])
+        self.assertEqual(3, site.renders)
+
+    def test_server_answers_304(self):
+        server = preview(self.content, self.template, self.static, None, 0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            connection = http.client.HTTPConnection("localhost", server.server_port)
+            connection.request("GET", "/blog/post.html")
+            response = connection.getresponse()
+            self.assertEqual(200, response.status)
+            self.assertIn(b"<h1>Post</h1>", response.read())
+            etag = response.getheader("ETag")
+            headers = {"If-None-Match": etag}
+            connection.request("GET", "/blog/post.html", headers=headers)
+            response = connection.getresponse()
+            self.assertEqual(304, response.status)
+            self.assertEqual(b"", response.read())
+            connection.request("GET", "/nope.html")
+            response = connection.getresponse()
+            self.assertEqual(404, response.status)
+            response.read()
+            connection.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+import unittest
+import block_markdown
+from profiler import Profiler, percentile
+
+
+class TestProfiler(unittest.TestCase):
+    def test_percentile(self):
+        values = [5.0, 1.0, 4.0, 2.0, 3.0]
+        self.assertEqual(1.0, percentile(values, 0.0))
+        self.assertEqual(3.0, percentile(values, 0.5))
+        self.assertEqual(5.0, percentile(values, 0.99))
+        self.assertEqual(0.0, percentile([], 0.5))
+
+    def test_nested_stages_are_exclusive(self):
+        profiler = Profiler()
+        with profiler.page("a.md"):
+            with profiler.stage("outer"):
+                with profiler.stage("inner"):
+                    sum(range(10000))
+        timings = profiler.pages["a.md"]
+        self.assertLessEqual(timings["outer"] + timings["inner"], timings["total"])
+        self.assertSetEqual({"outer", "inner"}, set(profiler.stages()))
+
+    def test_instrument_times_pipeline_and_restores(self):
+        original = block_markdown.text_to_textnodes
+        profiler = Profiler()
+        with profiler.instrument():
+            with profiler.page("a.md"):
+                block_markdown.markdown_to_html_node("# Title\n\nSome **text**")
+        self.assertIs(original, block_markdown.text_to_textnodes)
+        self.assertSetEqual(
+            {"markdown_to_blocks", "block_to_block_type", "text_to_textnodes", "total"},
+            set(profiler.pages["a.md"]),
+        )
+
+    def test_summary_and_json(self):
+        profiler = Profiler()
+        profiler.pages = {
+            "a.md": {"read": 0.1, "total": 0.3},
+            "b.md": {"read": 0.2, "total": 0.5},
+            "c.md": {"read": 0.1, "total": 0.1},
+        }
+        summary = profiler.summary(slowest=2)
+        self.assertEqual(3, summary["pages"])
+        self.assertAlmostEqual(0.4, summary["totals"]["read"])
+        self.assertEqual([("b.md", 0.5), ("a.md", 0.3)], summary["slowest"])
+        self.assertEqual(0.3, summary["percentiles"]["p50"])
+        self.assertIn("b.md", profiler.report(slowest=2))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "profile.json")
+            profiler.dump_json(path, slowest=2)
+            with open(path) as file:
+                report = json.load(file)
+        self.assertEqual(profiler.pages, report["page_timings"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+import unittest
+import utils
+from block_cache import configure_block_cache
+from metadata import SiteIndex
+from search import SearchIndex, decode_postings, encode_postings, shard_name
+from template import Template
+from writer import OutputWriter
+
+
+class TestSearch(unittest.TestCase):
+    def page_terms(self, markdown):
+        search_terms = utils.SEARCH_TERMS
+        utils.SEARCH_TERMS = True
+        try:
+            return utils.render_page(markdown, Template("{{ Content }}"))[1]["terms"]
+        finally:
+            utils.SEARCH_TERMS = search_terms
+
+    def test_page_terms(self):
+        md = "---\ntags: hidden\n---\n# The Title\n\nThe **bold** [link](/url) `code`"
+        expected = {"bold": 1, "code": 1, "link": 1, "the": 2, "title": 1}
+        self.assertDictEqual(expected, self.page_terms(md))
+        try:
+            configure_block_cache(16)
+            self.assertDictEqual(expected, self.page_terms(md))
+            self.assertDictEqual(expected, self.page_terms(md))
+        finally:
+            configure_block_cache(0)
+
+    def test_list_markers_are_not_terms(self):
+        md = "# T\n\n1. one\n2. two\n\n- three"
+        self.assertDictEqual(
+            {"one": 1, "t": 1, "three": 1, "two": 1}, self.page_terms(md)
+        )
+
+    def test_postings_round_trip(self):
+        postings = {7: 2, 3: 1, 12: 5}
+        self.assertListEqual([3, 1, 4, 2, 5, 5], encode_postings(postings))
+        self.assertDictEqual(postings, decode_postings(encode_postings(postings)))
+
+    def test_shard_name(self):
+        self.assertEqual("ab.json", shard_name("ab"))
+        self.assertEqual("_c3a9.json", shard_name("é"))
+
+    def test_ids_are_stable(self):
+        index = SearchIndex()
+        index.update("a.md", {"ring": 1})
+        index.update("b.md", {"ring": 2})
+        index.remove("a.md")
+        index.update("c.md", {"ring": 1})
+        self.assertDictEqual({"b.md": 1, "c.md": 2}, index.ids)
+        self.assertDictEqual({1: 2, 2: 1}, index.postings["ring"])
+
+    def test_incremental_write(self):
+        site = SiteIndex()
+        site.record("a.md", "/a.html", {"title": "A", "tags": []})
+        site.record("b.md", "/b.html", {"title": "B", "tags": []})
+        index = SearchIndex()
+        index.update("a.md", {"ring": 1, "shire": 2})
+        index.update("b.md", {"ring": 1})
+        with tempfile.TemporaryDirectory() as tmp:
+            dest = os.path.join(tmp, "search")
+            writer = OutputWriter()
+            self.assertEqual(2, index.write(dest, site, writer))
+            index.update("b.md", {"ring": 3})
+            self.assertEqual(1, index.write(dest, site, writer))
+            with open(os.path.join(dest, "ri.json")) as file:
+                self.assertDictEqual({"ring": [0, 1, 1, 3]}, json.load(file))
+            index.remove("a.md")
+            index.write(dest, site, writer)
+            self.assertFalse(os.path.exists(os.path.join(dest, "sh.json")))
+            path = os.path.join(tmp, "search.json")
+            index.save(path)
+            loaded = SearchIndex.load(path)
+        self.assertDictEqual(index.postings, loaded.postings)
+        self.assertEqual(2, loaded.next_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import contextlib
+import io
+import os
+import unittest
+import utils
+from fixtures import TempDirTestCase
+from utils import generate_page
+
+PAGES = {
+    "front-matter.md": (
+        "---\ntitle: Given & <Co>\ndate: 2024-01-02\ntags: [a, b]\n---\n"
+        "# Heading\n\nSome **text** and a [link](/x)\n\n```\ncode <b>\n```\n\n"
+        "- one\n- two\n"
+    ),
+    "plain.md": "# Plain *title*\n\nparagraph\n\n> quote\n> more",
+    "late-title.md": "---\ndate: 2024-01-02\n---\n\n\nIntro text\n\n## Sub\n\n# Late\n",
+    "unterminated.md": "---\nnot: front matter\n\n# Title\n\n1. one\n2. two\n",
+}
+
+
+class TestStreaming(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.template = os.path.join(self.root, "template.html")
+        self.write(self.template, "<title>{{ Title }}</title>\n{{ Content }}\n")
+        for name, markdown in PAGES.items():
+            self.write(os.path.join(self.root, "content", name), markdown)
+        self.threshold = utils.STREAM_THRESHOLD
+        self.search_terms = utils.SEARCH_TERMS
+
+    def tearDown(self):
+        utils.STREAM_THRESHOLD = self.threshold
+        utils.SEARCH_TERMS = self.search_terms
+        super().tearDown()
+
+    def render(self, name, threshold):
+        utils.STREAM_THRESHOLD = threshold
+        source = os.path.join(self.root, "content", name)
+        dest = os.path.join(self.root, f"public-{threshold}", name + ".html")
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = generate_page(source, self.template, dest)
+        return self.read_bytes(dest), result
+
+    def test_streamed_page_matches_buffered_page(self):
+        for search_terms in (False, True):
+            utils.SEARCH_TERMS = search_terms
+            for name in PAGES:
+                with self.subTest(name=name, search_terms=search_terms):
+                    self.assertEqual(
+                        self.render(name, 8 * 1024 * 1024), self.render(name, 0)
+                    )
+
+    def test_streamed_title(self):
+        page, result = self.render("front-matter.md", 0)
+        self.assertTrue(page.startswith(b"<title>Given &amp; &lt;Co&gt;</title>"))
+        self.assertEqual(["a", "b"], result["meta"]["tags"])
+        page, result = self.render("late-title.md", 0)
+        self.assertTrue(page.startswith(b"<title>Late</title>"))
+
+
+if __name__ == "__main__":
+    unittest.main()
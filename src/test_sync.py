@@ -0,0 +1,72 @@
+import os
+import unittest
+from fixtures import TempDirTestCase
+from sync import link_or_copy, list_files, sync_tree
+
+
+class TestSync(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.source = os.path.join(self.root, "static")
+        self.dest = os.path.join(self.root, "public")
+        self.manifest = os.path.join(self.root, "cache", "assets.json")
+        self.write(os.path.join(self.source, "index.css"), "body {}")
+        self.write(os.path.join(self.source, "images", "a.png"), "png")
+
+    def test_list_files(self):
+        self.assertListEqual(
+            ["index.css", os.path.join("images", "a.png")], list_files(self.source)
+        )
+
+    def test_sync_copies_then_skips(self):
+        self.assertEqual((2, 0, 0), sync_tree(self.source, self.dest, self.manifest))
+        self.assertEqual("png", self.read(os.path.join(self.dest, "images", "a.png")))
+        self.assertEqual((0, 2, 0), sync_tree(self.source, self.dest, self.manifest))
+
+    def test_sync_copies_changed_and_removes_stale(self):
+        sync_tree(self.source, self.dest, self.manifest)
+        css = os.path.join(self.source, "index.css")
+        self.write(css, "body { color: red }")
+        os.utime(css, ns=(1, 1))
+        os.remove(os.path.join(self.source, "images", "a.png"))
+        self.assertEqual((1, 0, 1), sync_tree(self.source, self.dest, self.manifest))
+        self.assertEqual(
+            "body { color: red }", self.read(os.path.join(self.dest, "index.css"))
+        )
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+
+    def test_sync_keeps_unmanaged_files(self):
+        page = os.path.join(self.dest, "index.html")
+        self.write(page, "<p>page</p>")
+        sync_tree(self.source, self.dest, self.manifest)
+        sync_tree(self.source, self.dest, self.manifest)
+        self.assertTrue(os.path.exists(page))
+
+    def test_sync_restores_missing_output(self):
+        sync_tree(self.source, self.dest, self.manifest)
+        os.remove(os.path.join(self.dest, "index.css"))
+        self.assertEqual((1, 1, 0), sync_tree(self.source, self.dest, self.manifest))
+
+    def test_sync_restores_assets_when_minify_changes(self):
+        css = os.path.join(self.dest, "index.css")
+        sync_tree(self.source, self.dest, self.manifest, minify=True)
+        os.remove(css)
+        self.write(css, "body{}")
+        self.assertEqual(
+            (0, 2, 0), sync_tree(self.source, self.dest, self.manifest, minify=True)
+        )
+        self.assertEqual((1, 1, 0), sync_tree(self.source, self.dest, self.manifest))
+        self.assertEqual("body {}", self.read(css))
+
+    def test_link_or_copy_overwrites(self):
+        source = os.path.join(self.source, "index.css")
+        dest = os.path.join(self.dest, "index.css")
+        link_or_copy(source, dest)
+        link_or_copy(source, dest)
+        self.assertEqual("body {}", self.read(dest))
+        link_or_copy(source, dest, link=False)
+        self.assertFalse(os.path.samefile(source, dest))
+
+
+if __name__ == "__main__":
+    unittest.main()
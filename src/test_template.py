@@ -0,0 +1,69 @@
+import io
+import os
+import tempfile
+import unittest
+from htmlnode import LeafNode, ParentNode
+from template import Template, load_template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_compile(self):
+        template = Template("<title>{{ Title }}</title><main>{{Content}}</main>")
+        self.assertListEqual(["<title>", "</title><main>", "</main>"], template.chunks)
+        self.assertListEqual(["Title", "Content"], template.slots)
+
+    def test_render(self):
+        template = Template("<h1>{{ Title }}</h1>{{ Content }}<p>{{ Date }}</p>")
+        content = ParentNode("div", [LeafNode("b", "bold")])
+        self.assertEqual(
+            "<h1>Hello</h1><div><b>bold</b></div><p>2024-01-01</p>",
+            template.render(
+                {"Title": "Hello", "Content": content, "Date": "2024-01-01"}
+            ),
+        )
+
+    def test_render_missing_slot(self):
+        template = Template("<h1>{{ Title }}</h1><p>{{ Author }}</p>")
+        self.assertEqual("<h1>Hello</h1><p></p>", template.render({"Title": "Hello"}))
+
+    def test_write_matches_render(self):
+        template = Template("{{ Title }}|{{ Content }}|{{ Title }}")
+        context = {"Title": "T", "Content": ParentNode("p", [LeafNode(None, "x")])}
+        buffer = io.StringIO()
+        template.write(context, buffer)
+        self.assertEqual(template.render(context), buffer.getvalue())
+        self.assertEqual("T|<p>x</p>|T", buffer.getvalue())
+
+    def test_no_slots(self):
+        template = Template("<p>static</p>")
+        self.assertEqual("<p>static</p>", template.render({"Title": "unused"}))
+
+
+class TestLoadTemplate(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "template.html")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, content, mtime):
+        with open(self.path, "w") as file:
+            file.write(content)
+        os.utime(self.path, ns=(mtime, mtime))
+
+    def test_load_template_is_cached(self):
+        self.write("<p>{{ Title }}</p>", 1_000_000_000)
+        self.assertIs(load_template(self.path), load_template(self.path))
+
+    def test_load_template_reloads_on_mtime_change(self):
+        self.write("<p>{{ Title }}</p>", 1_000_000_000)
+        first = load_template(self.path)
+        self.write("<h1>{{ Title }}</h1>", 2_000_000_000)
+        second = load_template(self.path)
+        self.assertIsNot(first, second)
+        self.assertEqual("<h1>x</h1>", second.render({"Title": "x"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
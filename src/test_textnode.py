@@ -1,5 +1,5 @@
 import unittest
-from textnode import TextNode, text_node_to_html_node
+from textnode import TextNode, text_node_to_html, text_node_to_html_node
 from htmlnode import LeafNode
 
 
@@ -28,6 +28,12 @@ class TestTextNode(unittest.TestCase):
             "TextNode(This is a text node, bold, https://www.boot.dev)", repr(node)
         )
 
+    def test_slots(self):
+        node = TextNode("This is a text node", "bold")
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.unknown = "value"
+
 
 class TestTextNodeToHTMLNode(unittest.TestCase):
     def test_text_node_to_html_node_text(self):
@@ -71,5 +77,27 @@ class TestTextNodeToHTMLNode(unittest.TestCase):
         )
 
 
+class TestTextNodeToHTML(unittest.TestCase):
+    def test_matches_html_node(self):
+        text_nodes = [
+            TextNode("plain", "text"),
+            TextNode("bold", "bold"),
+            TextNode("italic", "italic"),
+            TextNode("x = 1", "code"),
+            TextNode("a link", "link", "/to"),
+            TextNode("alt", "image", "/img.png"),
+        ]
+        for text_node in text_nodes:
+            with self.subTest(text_type=text_node.text_type):
+                self.assertEqual(
+                    text_node_to_html_node(text_node).to_html(),
+                    text_node_to_html(text_node),
+                )
+
+    def test_unsupported_type(self):
+        with self.assertRaises(ValueError):
+            text_node_to_html(TextNode("x", "underline"))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,129 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+import main
+import utils
+from fixtures import TempDirTestCase
+from watch import diff_snapshots, rebuild, scan
+from writer import configure_output_writer
+
+
+class TestWatch(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.public = os.path.join(self.root, "public")
+        self.template = os.path.join(self.root, "template.html")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+
+    def test_scan(self):
+        snapshot = scan([self.content, self.template, self.static])
+        self.assertSetEqual(
+            {
+                os.path.join(self.content, "index.md"),
+                os.path.join(self.content, "blog", "post.md"),
+                os.path.join(self.static, "index.css"),
+                self.template,
+            },
+            set(snapshot),
+        )
+
+    def test_diff_snapshots(self):
+        old = {"a": (1, 1), "b": (1, 1), "c": (1, 1)}
+        new = {"a": (1, 1), "b": (2, 1), "d": (1, 1)}
+        self.assertEqual((["b", "d"], ["c"]), diff_snapshots(old, new))
+
+    def test_rebuild_page_and_asset(self):
+        post = os.path.join(self.content, "blog", "post.md")
+        css = os.path.join(self.static, "index.css")
+        count = rebuild(
+            [post, css], [], self.content, self.template, self.static, self.public
+        )
+        self.assertEqual(2, count)
+        self.assertEqual(
+            "<title>Post</title><div><h1>Post</h1></div>",
+            self.read(os.path.join(self.public, "blog", "post.html")),
+        )
+        self.assertEqual("body {}", self.read(os.path.join(self.public, "index.css")))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "index.html")))
+
+    def test_rebuild_template_regenerates_all_pages(self):
+        count = rebuild(
+            [self.template], [], self.content, self.template, self.static, self.public
+        )
+        self.assertEqual(2, count)
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "blog", "post.html")))
+
+    def test_rebuild_removed_page(self):
+        post = os.path.join(self.content, "blog", "post.md")
+        rebuild([post], [], self.content, self.template, self.static, self.public)
+        os.remove(post)
+        rebuild([], [post], self.content, self.template, self.static, self.public)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog")))
+
+    def test_rebuild_reports_page_results(self):
+        post = os.path.join(self.content, "blog", "post.md")
+        index = os.path.join(self.content, "index.md")
+        results = {}
+        rebuild(
+            [post],
+            [index],
+            self.content,
+            self.template,
+            self.static,
+            self.public,
+            results,
+        )
+        dest_file, result = results[post]
+        self.assertEqual(os.path.join(self.public, "blog", "post.html"), dest_file)
+        self.assertEqual("Post", result["meta"]["title"])
+        self.assertIsNone(results[index])
+
+    def test_after_rebuild_runs_post_build_steps(self):
+        # main works on content/, static/ and public/ in the current directory.
+        cwd = os.getcwd()
+        search_terms = utils.SEARCH_TERMS
+        os.chdir(self.root)
+        try:
+            with mock.patch.object(sys, "argv", ["main.py", "--minify", "--search"]):
+                args = main.parse_args()
+            utils.SEARCH_TERMS = True
+            writer = configure_output_writer(main.OUTPUTS_FILE, minify=True)
+            with contextlib.redirect_stdout(io.StringIO()):
+                main.build(args, None)
+                post = os.path.join("content", "blog", "post.md")
+                css = os.path.join("static", "index.css")
+                self.write(post, "# Post\n\nA new paragraph")
+                self.write(css, "body {\n  color: red;\n}\n")
+                results = {}
+                rebuild(
+                    [css, post],
+                    [],
+                    "content",
+                    "template.html",
+                    "static",
+                    "public",
+                    results,
+                )
+                main.after_rebuild(args, results)
+            writer.save()
+            self.assertEqual("body{color:red}", self.read("public/index.css"))
+            with open(os.path.join("public", "search", "pa.json")) as file:
+                self.assertIn("paragraph", json.load(file))
+        finally:
+            os.chdir(cwd)
+            utils.SEARCH_TERMS = search_terms
+            configure_output_writer()
+
+
+if __name__ == "__main__":
+    unittest.main()
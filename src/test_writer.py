@@ -0,0 +1,124 @@
+import os
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from fixtures import TempDirTestCase
+from utils import generate_pages_recursive, prune_outputs, recursive_copy
+from writer import OutputWriter, configure_output_writer
+
+
+class TestOutputWriter(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.page = os.path.join(self.root, "public", "blog", "index.html")
+        self.digests = os.path.join(self.root, "cache", "outputs.json")
+
+    def test_write_creates_dirs(self):
+        writer = OutputWriter()
+        writer.write(self.page, "<p>hi</p>")
+        self.assertEqual("<p>hi</p>", self.read(self.page))
+        self.assertDictEqual({"written": 1, "skipped": 0}, writer.stats())
+        self.assertListEqual(["index.html"], os.listdir(os.path.dirname(self.page)))
+
+    def test_identical_output_keeps_mtime(self):
+        OutputWriter().write(self.page, "<p>hi</p>")
+        os.utime(self.page, ns=(1, 1))
+        writer = OutputWriter()
+        writer.write(self.page, "<p>hi</p>")
+        self.assertEqual(1, os.stat(self.page).st_mtime_ns)
+        self.assertDictEqual({"written": 0, "skipped": 1}, writer.stats())
+        writer.write(self.page, "<p>ho</p>")
+        self.assertEqual("<p>ho</p>", self.read(self.page))
+        self.assertDictEqual({"written": 1, "skipped": 1}, writer.stats())
+
+    def test_open_streams_and_compares(self):
+        writer = OutputWriter()
+        for _ in range(2):
+            with writer.open(self.page) as file:
+                file.writelines(["<div>", "é", "</div>"])
+        self.assertEqual("<div>é</div>", self.read(self.page))
+        self.assertDictEqual({"written": 1, "skipped": 1}, writer.stats())
+
+    def test_failed_write_leaves_page(self):
+        writer = OutputWriter()
+        writer.write(self.page, "<p>hi</p>")
+        with self.assertRaises(ValueError):
+            with writer.open(self.page) as file:
+                file.write("<p>half")
+                raise ValueError("render failed")
+        self.assertEqual("<p>hi</p>", self.read(self.page))
+        self.assertListEqual(["index.html"], os.listdir(os.path.dirname(self.page)))
+
+    def test_saved_digests_are_trusted(self):
+        writer = OutputWriter(self.digests)
+        writer.write(self.page, "<p>hi</p>")
+        writer.save()
+        writer = OutputWriter(self.digests)
+        self.assertTrue(
+            writer.unchanged(self.page, writer.digests[self.page]["hash"], 9)
+        )
+        writer.note(self.page)
+        self.assertDictEqual({"written": 0, "skipped": 1}, writer.stats())
+
+    def test_prune_removes_outputs_not_seen(self):
+        other = os.path.join(self.root, "public", "old", "index.html")
+        replaced = os.path.join(self.root, "public", "index.css")
+        writer = OutputWriter(self.digests)
+        for path in (self.page, other, replaced):
+            writer.write(path, "x")
+        writer.save()
+        with open(replaced, "w") as file:
+            file.write("body {}")
+        writer = OutputWriter(self.digests)
+        writer.write(self.page, "x")
+        self.assertListEqual([other], writer.prune())
+        self.assertFalse(os.path.exists(other))
+        self.assertEqual("body {}", self.read(replaced))
+        self.assertListEqual([self.page], list(writer.digests))
+
+    def test_default_build_skips_identical_pages(self):
+        root = self.root
+        for path, text in (
+            ("static/index.css", "body {}"),
+            ("static/blog/post.css", "p {}"),
+            ("content/index.md", "# Home"),
+            ("content/blog/post.md", "# Post"),
+            ("template.html", "<title>{{ Title }}</title>{{ Content }}"),
+        ):
+            path = os.path.join(root, path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as file:
+                file.write(text)
+        static = os.path.join(root, "static")
+        content = os.path.join(root, "content")
+        template = os.path.join(root, "template.html")
+        public = os.path.join(root, "public")
+        stats = []
+        try:
+            for _ in range(2):
+                writer = configure_output_writer(self.digests)
+                with redirect_stdout(StringIO()):
+                    recursive_copy(static, public, keep=writer.digests)
+                    generate_pages_recursive(content, template, public)
+                    prune_outputs(public)
+                writer.save()
+                stats.append(writer.stats())
+            os.remove(os.path.join(content, "blog", "post.md"))
+            writer = configure_output_writer(self.digests)
+            with redirect_stdout(StringIO()):
+                recursive_copy(static, public, keep=writer.digests)
+                generate_pages_recursive(content, template, public)
+                prune_outputs(public)
+        finally:
+            configure_output_writer()
+        self.assertListEqual(
+            [{"written": 2, "skipped": 0}, {"written": 0, "skipped": 2}], stats
+        )
+        self.assertListEqual(
+            ["blog", "index.css", "index.html"], sorted(os.listdir(public))
+        )
+        self.assertListEqual(["post.css"], os.listdir(os.path.join(public, "blog")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,29 @@
-from htmlnode import LeafNode
+import hashlib
+import json
+from typing import Dict
+from htmlnode import LeafNode, escape_attribute, escape_text
 from enum import Enum
 
 TextType = Enum("TextType", ["text", "bold", "italic", "code", "link", "image"])
 
+# Extra <img> attributes (width, height, srcset, ...) keyed by image URL,
+# filled in by the image pipeline before pages are rendered.
+IMAGE_ATTRIBUTES: Dict[str, Dict[str, str]] = {}
+IMAGE_ATTRIBUTES_DIGEST = ""
+
+
+def set_image_attributes(attributes: Dict[str, Dict[str, str]]) -> None:
+    global IMAGE_ATTRIBUTES, IMAGE_ATTRIBUTES_DIGEST
+    IMAGE_ATTRIBUTES = attributes
+    IMAGE_ATTRIBUTES_DIGEST = ""
+    if attributes:
+        data = json.dumps(attributes, sort_keys=True).encode()
+        IMAGE_ATTRIBUTES_DIGEST = hashlib.sha1(data).hexdigest()
+
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
@@ -35,7 +54,38 @@ def text_node_to_html_node(text_node):
             return LeafNode("a", text_node.text, props={"href": text_node.url})
         case TextType.image.name:
             return LeafNode(
-                "img", "", props={"src": text_node.url, "alt": text_node.text}
+                "img",
+                "",
+                props={
+                    "src": text_node.url,
+                    "alt": text_node.text,
+                    **IMAGE_ATTRIBUTES.get(text_node.url, {}),
+                },
+            )
+        case _:
+            raise ValueError("Unsupported text type")
+
+
+def text_node_to_html(text_node) -> str:
+    text = escape_text(text_node.text)
+    match text_node.text_type:
+        case TextType.text.name:
+            return text
+        case TextType.bold.name:
+            return f"<b>{text}</b>"
+        case TextType.italic.name:
+            return f"<i>{text}</i>"
+        case TextType.code.name:
+            return f"<code>{text}</code>"
+        case TextType.link.name:
+            return f'<a href="{escape_attribute(text_node.url)}">{text}</a>'
+        case TextType.image.name:
+            src = escape_attribute(text_node.url)
+            alt = escape_attribute(text_node.text)
+            extra = "".join(
+                f' {key}="{escape_attribute(value)}"'
+                for key, value in IMAGE_ATTRIBUTES.get(text_node.url, {}).items()
             )
+            return f'<img src="{src}" alt="{alt}"{extra}></img>'
         case _:
             raise ValueError("Unsupported text type")
@@ -1,18 +1,70 @@
+import functools
+import io
 import os
 import shutil
-from block_markdown import markdown_to_html_node, extract_title
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import async_build
+from ast_cache import active_ast_cache, configure_ast_cache
+from block_cache import active_block_cache, configure_block_cache
+from block_markdown import (
+    block_to_html,
+    blocks_to_html_fragments,
+    extract_title_from_lines,
+    ir_to_html,
+    iter_markdown_blocks,
+)
+from deps import (
+    DependencyCollector,
+    DependencyIndex,
+    page_url,
+    report_broken_links,
+)
+from manifest import hash_file, load_manifest, save_manifest, source_entry
+from metadata import (
+    SiteIndex,
+    page_metadata,
+    parse_page,
+    read_front_matter,
+    template_fields,
+)
+from search import SearchIndex
+from template import Template, load_template
+import textnode
+from writer import active_output_writer, configure_output_writer
 
+# Sources at least this large are rendered block by block straight into
+# the output file instead of being read into memory whole.
+STREAM_THRESHOLD = 8 * 1024 * 1024
 
-def recursive_copy(source: str, destination: str) -> None:
+# Number of concurrent reads and writes of the asyncio pipeline; 0 keeps
+# the synchronous one.
+IO_CONCURRENCY = 0
+
+# Whether page results carry the search terms of the page.
+SEARCH_TERMS = False
+
+
+def clear_directory(path: str, keep: Set[str]) -> None:
+    for item in os.listdir(path):
+        item_path = os.path.join(path, item)
+        if os.path.isdir(item_path):
+            clear_directory(item_path, keep)
+            if not os.listdir(item_path):
+                os.rmdir(item_path)
+        elif os.path.isfile(item_path) and os.path.normpath(item_path) not in keep:
+            os.remove(item_path)
+
+
+def recursive_copy(
+    source: str, destination: str, keep: Iterable[str] = ()
+) -> None:
+    # Files in keep survive the clean so the output writer can tell that a
+    # page it is about to write is already on disk.
     if not os.path.exists(destination):
         os.mkdir(destination)
     else:
-        for item in os.listdir(destination):
-            item_path = os.path.join(destination, item)
-            if os.path.isdir(item_path):
-                shutil.rmtree(item_path)
-            elif os.path.isfile(item_path):
-                os.remove(item_path)
+        clear_directory(destination, {os.path.normpath(path) for path in keep})
     for item in os.listdir(source):
         source_path = os.path.join(source, item)
         destination_path = os.path.join(destination, item)
@@ -20,32 +72,391 @@ def recursive_copy(source: str, destination: str) -> None:
             print(f"Copying {source_path} to {destination_path}")
             shutil.copy(source_path, destination_path)
         elif os.path.isdir(source_path):
-            recursive_copy(source_path, destination_path)
+            recursive_copy(source_path, destination_path, keep)
+
+
+def prune_outputs(dest_path: str) -> List[str]:
+    removed = active_output_writer().prune()
+    for path in removed:
+        print(f"Removing {path}")
+    for dir_path in sorted({os.path.dirname(path) for path in removed}, reverse=True):
+        if os.path.isdir(dir_path):
+            remove_empty_dirs(dir_path, dest_path)
+    return removed
+
+
+def block_renderer(collector: DependencyCollector) -> Callable[[str], str]:
+    cache = active_block_cache()
+    if cache is None:
+        return lambda block: block_to_html(block, collector.add_nodes)
+    return lambda block: cache.render(block, collector)
+
+
+def page_context(
+    metadata: Dict, blocks: List[str], collector: DependencyCollector
+) -> Dict:
+    content = list(blocks_to_html_fragments(blocks, block_renderer(collector)))
+    return {**template_fields(metadata), "Content": content}
+
 
+def page_result(collector: DependencyCollector, metadata: Dict) -> Dict:
+    result = collector.result()
+    result["meta"] = metadata
+    return result
 
-def generate_page(source_file, template_file, dest_file) -> None:
+
+def flush_caches() -> None:
+    for cache in (active_block_cache(), active_ast_cache()):
+        if cache is not None:
+            cache.flush()
+
+
+def stream_page(markdown: str, template: Template, file) -> Dict:
+    ast_cache = active_ast_cache()
+    if ast_cache is None:
+        metadata, blocks = parse_page(markdown)
+        collector = DependencyCollector(SEARCH_TERMS)
+        template.write(page_context(metadata, blocks, collector), file)
+        return page_result(collector, metadata)
+    # A cached tree only needs serializing, so template and escaping
+    # changes skip the markdown parser entirely.
+    document = ast_cache.parse(markdown, SEARCH_TERMS)
+    content = list(blocks_to_html_fragments(document["body"], ir_to_html))
+    template.write({**template_fields(document["meta"]), "Content": content}, file)
+    result = {"links": document["links"], "images": document["images"]}
+    result["meta"] = document["meta"]
+    if SEARCH_TERMS:
+        result["terms"] = document["terms"]
+    return result
+
+
+def render_page(markdown: str, template: Template) -> Tuple[str, Dict]:
+    buffer = io.StringIO()
+    result = stream_page(markdown, template, buffer)
+    return buffer.getvalue(), result
+
+
+def write_page(dest_file, page: str) -> None:
+    active_output_writer().write(dest_file, page)
+
+
+def generate_page_streaming(source_file, template_file, dest_file) -> Dict:
+    with open(source_file, "r") as file:
+        front_matter = read_front_matter(file)
+        title = None
+        if "title" not in front_matter:
+            title = extract_title_from_lines(file)
+    metadata = page_metadata(front_matter, title)
+    collector = DependencyCollector(SEARCH_TERMS)
+    template = load_template(template_file)
+    with open(source_file, "r") as source, active_output_writer().open(
+        dest_file
+    ) as dest:
+        read_front_matter(source)
+        blocks = iter_markdown_blocks(source)
+        content = blocks_to_html_fragments(blocks, block_renderer(collector))
+        template.write({**template_fields(metadata), "Content": content}, dest)
+    flush_caches()
+    return page_result(collector, metadata)
+
+
+def generate_page(source_file, template_file, dest_file) -> Dict:
     print(f"Generating page from {source_file} to {dest_file} using {template_file}")
+    if os.path.getsize(source_file) >= STREAM_THRESHOLD:
+        return generate_page_streaming(source_file, template_file, dest_file)
     with open(source_file, "r") as source_file:
         markdown = source_file.read()
-    with open(template_file, "r") as template_file:
-        template = template_file.read()
-    title = extract_title(markdown)
-    html_node = markdown_to_html_node(markdown)
-    content = html_node.to_html()
-    page = template.replace("{{ Title }}", title).replace("{{ Content }}", content)
-    dest_dir_path = os.path.dirname(dest_file)
-    if dest_dir_path != "":
-        os.makedirs(dest_dir_path, exist_ok=True)
-    with open(dest_file, "w") as dest_file:
-        dest_file.write(page)
-
-
-def generate_pages_recursive(source_path, template_file, dest_path) -> None:
-    for item in os.listdir(source_path):
+    template = load_template(template_file)
+    with active_output_writer().open(dest_file) as dest_file:
+        result = stream_page(markdown, template, dest_file)
+    flush_caches()
+    return result
+
+
+def generate_page_profiled(source_file, template_file, dest_file, profiler) -> Dict:
+    print(f"Generating page from {source_file} to {dest_file} using {template_file}")
+    with profiler.page(source_file):
+        with profiler.stage("read"):
+            with open(source_file, "r") as file:
+                markdown = file.read()
+        with profiler.stage("load_template"):
+            template = load_template(template_file)
+        with profiler.stage("parse"):
+            metadata, blocks = parse_page(markdown)
+        with profiler.stage("to_html"):
+            collector = DependencyCollector(SEARCH_TERMS)
+            render_html = functools.partial(block_to_html, on_nodes=collector.add_nodes)
+            content = "".join(blocks_to_html_fragments(blocks, render_html))
+        with profiler.stage("template"):
+            page = template.render({**template_fields(metadata), "Content": content})
+        with profiler.stage("write"):
+            write_page(dest_file, page)
+        with profiler.stage("dependencies"):
+            return page_result(collector, metadata)
+
+
+_worker_template_file = ""
+
+
+def _init_worker(
+    template_file,
+    block_cache_settings,
+    stream_threshold,
+    search_terms,
+    image_attributes,
+    minify,
+    ast_cache_path,
+) -> None:
+    global _worker_template_file, STREAM_THRESHOLD, SEARCH_TERMS
+    _worker_template_file = template_file
+    configure_output_writer(None, minify)
+    STREAM_THRESHOLD = stream_threshold
+    SEARCH_TERMS = search_terms
+    textnode.set_image_attributes(image_attributes)
+    if block_cache_settings is not None:
+        configure_block_cache(*block_cache_settings)
+    configure_ast_cache(ast_cache_path)
+
+
+def _render_source(job) -> Tuple[Optional[str], Optional[Dict], Optional[str]]:
+    source_file, dest_file = job
+    try:
+        if os.path.getsize(source_file) >= STREAM_THRESHOLD:
+            deps = generate_page_streaming(
+                source_file, _worker_template_file, dest_file
+            )
+            return None, deps, None
+        with open(source_file, "r") as file:
+            markdown = file.read()
+        template = load_template(_worker_template_file)
+        page, result = render_page(markdown, template)
+        flush_caches()
+        return page, result, None
+    except Exception as e:
+        return None, None, f"{type(e).__name__}: {e}"
+
+
+def worker_pool_kwargs(template_file: str) -> Dict:
+    # Keyword arguments for a ProcessPoolExecutor whose workers render pages
+    # with this process's settings and caches.
+    cache = active_block_cache()
+    block_cache_settings = None
+    if cache is not None:
+        block_cache_settings = (cache.max_entries, cache.path)
+    ast_cache = active_ast_cache()
+    ast_cache_path = ast_cache.path if ast_cache is not None else None
+    return {
+        "initializer": _init_worker,
+        "initargs": (
+            template_file,
+            block_cache_settings,
+            STREAM_THRESHOLD,
+            SEARCH_TERMS,
+            textnode.IMAGE_ATTRIBUTES,
+            active_output_writer().minify,
+            ast_cache_path,
+        ),
+    }
+
+
+def generate_pages_parallel(pages, template_file, workers: int) -> Dict[str, Dict]:
+    deps: Dict[str, Dict] = {}
+    chunksize = max(1, min(64, len(pages) // (workers * 4)))
+    errors: List[str] = []
+    with ProcessPoolExecutor(
+        max_workers=workers, **worker_pool_kwargs(template_file)
+    ) as executor:
+        results = executor.map(_render_source, pages, chunksize=chunksize)
+        for (source_file, dest_file), (page, page_deps, error) in zip(
+            pages, results
+        ):
+            if error is not None:
+                errors.append(f"{source_file}: {error}")
+                continue
+            print(
+                f"Generating page from {source_file} to {dest_file} using {template_file}"
+            )
+            if page is not None:
+                write_page(dest_file, page)
+            else:
+                active_output_writer().note(dest_file)
+            deps[source_file] = page_deps
+    if errors:
+        for error in errors:
+            print(f"Error: {error}")
+        raise Exception(f"{len(errors)} page(s) failed to render")
+    return deps
+
+
+def generate_pages(
+    pages, template_file, workers: int = 1, profiler=None
+) -> Dict[str, Dict]:
+    if profiler is not None:
+        with profiler.instrument():
+            return {
+                source_file: generate_page_profiled(
+                    source_file, template_file, dest_file, profiler
+                )
+                for source_file, dest_file in pages
+            }
+    if IO_CONCURRENCY > 0 and len(pages) > 1:
+        return async_build.generate_pages_async(
+            pages, template_file, workers, IO_CONCURRENCY
+        )
+    if workers > 1 and len(pages) > 1:
+        return generate_pages_parallel(pages, template_file, workers)
+    return {
+        source_file: generate_page(source_file, template_file, dest_file)
+        for source_file, dest_file in pages
+    }
+
+
+def dest_for_source(source_file, source_path, dest_path) -> str:
+    relative_path = os.path.relpath(source_file, source_path)
+    return os.path.join(dest_path, os.path.splitext(relative_path)[0] + ".html")
+
+
+def find_pages(source_path, dest_path) -> List[Tuple[str, str]]:
+    pages: List[Tuple[str, str]] = []
+    for item in sorted(os.listdir(source_path)):
         source_item_path = os.path.join(source_path, item)
         dest_item_path = os.path.join(dest_path, item)
         if os.path.isfile(source_item_path):
-            dest_item_file = dest_item_path.rstrip(".md") + ".html"
-            generate_page(source_item_path, template_file, dest_item_file)
+            dest_item_file = os.path.splitext(dest_item_path)[0] + ".html"
+            pages.append((source_item_path, dest_item_file))
         else:
-            generate_pages_recursive(source_item_path, template_file, dest_item_path)
+            pages.extend(find_pages(source_item_path, dest_item_path))
+    return pages
+
+
+def generate_pages_recursive(
+    source_path,
+    template_file,
+    dest_path,
+    workers: int = 1,
+    profiler=None,
+    static_path=None,
+    site_file=None,
+    search: Optional[SearchIndex] = None,
+) -> SiteIndex:
+    pages = find_pages(source_path, dest_path)
+    deps = generate_pages(pages, template_file, workers, profiler)
+    site = SiteIndex()
+    index = DependencyIndex()
+    for source_file, dest_file in pages:
+        url = page_url(dest_file, dest_path)
+        site.record(source_file, url, deps[source_file]["meta"])
+        index.record(source_file, url, template_file, deps[source_file])
+        if search is not None:
+            search.update(source_file, deps[source_file]["terms"])
+    if search is not None:
+        for source_file in list(search.pages):
+            if source_file not in site.pages:
+                search.remove(source_file)
+    if site_file:
+        site.save(site_file)
+    if static_path is not None:
+        report_broken_links(index, static_path)
+    return site
+
+
+def remove_empty_dirs(dir_path, root_path) -> None:
+    root_path = os.path.normpath(root_path)
+    dir_path = os.path.normpath(dir_path)
+    while dir_path != root_path and dir_path.startswith(root_path + os.sep):
+        if os.listdir(dir_path):
+            return
+        os.rmdir(dir_path)
+        dir_path = os.path.dirname(dir_path)
+
+
+def generate_pages_incremental(
+    source_path,
+    template_file,
+    dest_path,
+    manifest_file,
+    workers: int = 1,
+    profiler=None,
+    static_path="static",
+    deps_file=None,
+    site_file=None,
+    search: Optional[SearchIndex] = None,
+) -> SiteIndex:
+    manifest = load_manifest(manifest_file)
+    old_pages = manifest["pages"]
+    index = DependencyIndex.load(deps_file) if deps_file else DependencyIndex()
+    site = SiteIndex.load(site_file) if site_file else SiteIndex()
+    template_hash = hash_file(template_file)
+    minify = active_output_writer().minify
+    invalidated = set()
+    if manifest["template"] != template_hash:
+        invalidated |= index.dependents(template_file)
+    if manifest.get("minify", False) != minify:
+        invalidated |= old_pages.keys()
+    if manifest.get("images", "") != textnode.IMAGE_ATTRIBUTES_DIGEST:
+        invalidated |= {
+            source_file for source_file, page in index.pages.items() if page["images"]
+        }
+    for asset in index.changed_assets(static_path):
+        print(f"Asset {asset} changed")
+        invalidated |= index.dependents(asset)
+    pages = {}
+    stale_pages: List[Tuple[str, str]] = []
+    for source_file, dest_file in find_pages(source_path, dest_path):
+        previous = old_pages.get(source_file)
+        entry = source_entry(source_file, previous, dest_file)
+        if (
+            source_file in invalidated
+            or (deps_file and source_file not in index.pages)
+            or (site_file and source_file not in site.pages)
+            or (search is not None and source_file not in search.pages)
+            or previous is None
+            or previous["hash"] != entry["hash"]
+            or previous["dest"] != dest_file
+            or not os.path.exists(dest_file)
+        ):
+            stale_pages.append((source_file, dest_file))
+        pages[source_file] = entry
+    deps = generate_pages(stale_pages, template_file, workers, profiler)
+    for source_file, dest_file in stale_pages:
+        url = page_url(dest_file, dest_path)
+        index.record(source_file, url, template_file, deps[source_file])
+        site.record(source_file, url, deps[source_file]["meta"])
+        if search is not None:
+            search.update(source_file, deps[source_file]["terms"])
+    dest_files = {entry["dest"] for entry in pages.values()}
+    for source_file, entry in old_pages.items():
+        if source_file in pages or entry["dest"] in dest_files:
+            continue
+        if os.path.exists(entry["dest"]):
+            print(f"Removing {entry['dest']} (source {source_file} is gone)")
+            os.remove(entry["dest"])
+            remove_empty_dirs(os.path.dirname(entry["dest"]), dest_path)
+    for source_file in list(index.pages):
+        if source_file not in pages:
+            index.remove(source_file)
+    for source_file in list(site.pages):
+        if source_file not in pages:
+            site.remove(source_file)
+    if search is not None:
+        for source_file in list(search.pages):
+            if source_file not in pages:
+                search.remove(source_file)
+    index.update_assets(static_path)
+    save_manifest(
+        {
+            "template": template_hash,
+            "images": textnode.IMAGE_ATTRIBUTES_DIGEST,
+            "minify": minify,
+            "pages": pages,
+        },
+        manifest_file,
+    )
+    if deps_file:
+        index.save(deps_file)
+    if site_file:
+        site.save(site_file)
+    skipped = len(pages) - len(stale_pages)
+    print(f"{len(stale_pages)} page(s) generated, {skipped} unchanged")
+    report_broken_links(index, static_path)
+    return site
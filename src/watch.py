@@ -0,0 +1,144 @@
+import functools
+import os
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from sync import link_or_copy
+from utils import dest_for_source, find_pages, generate_page, remove_empty_dirs
+from writer import active_output_writer
+
+Snapshot = Dict[str, Tuple[int, int]]
+# Source file to its output and page result, or None for a removed page.
+PageResults = Dict[str, Optional[Tuple[str, Dict]]]
+
+
+def scan(paths: List[str]) -> Snapshot:
+    snapshot: Snapshot = {}
+    stack = list(paths)
+    while stack:
+        path = stack.pop()
+        try:
+            if os.path.isfile(path):
+                stat = os.stat(path)
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+                continue
+            entries = list(os.scandir(path))
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(entry.path)
+            elif entry.is_file():
+                stat = entry.stat()
+                snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def diff_snapshots(old: Snapshot, new: Snapshot) -> Tuple[List[str], List[str]]:
+    changed = sorted(path for path, stat in new.items() if old.get(path) != stat)
+    removed = sorted(path for path in old if path not in new)
+    return changed, removed
+
+
+def serve(directory: str, port: int) -> ThreadingHTTPServer:
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=directory)
+    server = ThreadingHTTPServer(("", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    print(f"Serving {directory} on http://localhost:{port}")
+    return server
+
+
+def is_under(path: str, root: str) -> bool:
+    return os.path.commonpath([path, root]) == os.path.normpath(root)
+
+
+def rebuild(
+    changed: List[str],
+    removed: List[str],
+    content_path: str,
+    template_file: str,
+    static_path: str,
+    dest_path: str,
+    results: Optional[PageResults] = None,
+) -> int:
+    if results is None:
+        results = {}
+    if template_file in changed:
+        pages = find_pages(content_path, dest_path)
+        for source_file, dest_file in pages:
+            result = generate_page(source_file, template_file, dest_file)
+            results[source_file] = (dest_file, result)
+        changed = [path for path in changed if not is_under(path, content_path)]
+        count = len(pages)
+    else:
+        count = 0
+    for path in changed:
+        if is_under(path, content_path):
+            dest_file = dest_for_source(path, content_path, dest_path)
+            results[path] = (dest_file, generate_page(path, template_file, dest_file))
+        elif is_under(path, static_path):
+            destination = os.path.join(dest_path, os.path.relpath(path, static_path))
+            print(f"Copying {path} to {destination}")
+            link_or_copy(path, destination)
+        else:
+            continue
+        count += 1
+    for path in removed:
+        if is_under(path, content_path):
+            destination = dest_for_source(path, content_path, dest_path)
+            results[path] = None
+        elif is_under(path, static_path):
+            destination = os.path.join(dest_path, os.path.relpath(path, static_path))
+        else:
+            continue
+        if os.path.exists(destination):
+            print(f"Removing {destination}")
+            os.remove(destination)
+            remove_empty_dirs(os.path.dirname(destination), dest_path)
+        count += 1
+    return count
+
+
+def watch(
+    content_path: str,
+    template_file: str,
+    static_path: str,
+    dest_path: str,
+    interval: float = 0.1,
+    after_rebuild: Optional[Callable[[PageResults], None]] = None,
+) -> None:
+    # after_rebuild runs the steps a full build takes after rendering pages
+    # (listings, search shards, minified assets, compression) so the watched
+    # output stays what a build of the same tree would produce.
+    paths = [content_path, template_file, static_path]
+    snapshot = scan(paths)
+    print(f"Watching {', '.join(paths)} for changes (Ctrl-C to stop)")
+    while True:
+        time.sleep(interval)
+        new_snapshot = scan(paths)
+        changed, removed = diff_snapshots(snapshot, new_snapshot)
+        snapshot = new_snapshot
+        if not changed and not removed:
+            continue
+        start = time.perf_counter()
+        results: PageResults = {}
+        try:
+            count = rebuild(
+                changed,
+                removed,
+                content_path,
+                template_file,
+                static_path,
+                dest_path,
+                results,
+            )
+            if after_rebuild is not None:
+                after_rebuild(results)
+        except Exception as e:
+            print(f"Error: {type(e).__name__}: {e}")
+            continue
+        active_output_writer().save()
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"Rebuilt {count} file(s) in {elapsed:.1f} ms")
@@ -0,0 +1,181 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from manifest import hash_file, load_manifest, save_manifest
+from minify import MINIFIERS
+
+
+def empty_output_manifest() -> Dict:
+    return {"outputs": {}}
+
+
+class HashingFile:
+    def __init__(self, file):
+        self.file = file
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, text: str) -> int:
+        data = text.encode()
+        self.digest.update(data)
+        self.size += len(data)
+        self.file.write(data)
+        return len(text)
+
+    def writelines(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            self.write(line)
+
+
+class OutputWriter:
+    def __init__(self, digests_file: Optional[str] = None, minify: bool = False):
+        self.digests_file = digests_file
+        self.minify = minify
+        self.digests: Dict[str, Dict] = {}
+        # Outputs written or confirmed by this build.
+        self.seen: Set[str] = set()
+        self.written = 0
+        self.skipped = 0
+        self.lock = threading.Lock()
+        if digests_file is not None:
+            self.digests = load_manifest(digests_file, empty_output_manifest)["outputs"]
+
+    def unchanged(self, path: str, digest: str, size: int) -> bool:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return False
+        if stat.st_size != size:
+            return False
+        recorded = self.recorded(path, stat)
+        if recorded is not None:
+            return recorded == digest
+        return hash_file(path) == digest
+
+    def recorded(
+        self, path: str, stat: Optional[os.stat_result] = None
+    ) -> Optional[str]:
+        # Trust the digest recorded when the output was last written instead
+        # of reading it back, as long as nothing touched the file since.
+        if stat is None:
+            stat = os.stat(path)
+        entry = self.digests.get(path)
+        if (
+            entry is not None
+            and entry["size"] == stat.st_size
+            and entry["mtime"] == stat.st_mtime_ns
+        ):
+            return entry["hash"]
+        return None
+
+    def record(self, path: str, digest: str, written: bool) -> None:
+        stat = os.stat(path)
+        with self.lock:
+            self.digests[path] = {
+                "hash": digest,
+                "size": stat.st_size,
+                "mtime": stat.st_mtime_ns,
+            }
+            self.seen.add(path)
+            if written:
+                self.written += 1
+            else:
+                self.skipped += 1
+
+    def minifier(self, path: str) -> Optional[Callable[[str], str]]:
+        if not self.minify:
+            return None
+        return MINIFIERS.get(os.path.splitext(path)[1].lower())
+
+    @contextmanager
+    def open(self, path: str):
+        minifier = self.minifier(path)
+        if minifier is None:
+            with self.open_raw(path) as file:
+                yield file
+            return
+        # Minifying needs the whole document, so the page is buffered even
+        # when the renderer streams it.
+        buffer = io.StringIO()
+        yield buffer
+        with self.open_raw(path) as file:
+            file.write(minifier(buffer.getvalue()))
+
+    @contextmanager
+    def open_raw(self, path: str):
+        dir_path = os.path.dirname(path) or "."
+        os.makedirs(dir_path, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=dir_path, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as file:
+                hashing_file = HashingFile(file)
+                yield hashing_file
+            digest = hashing_file.digest.hexdigest()
+            if self.unchanged(path, digest, hashing_file.size):
+                os.remove(tmp_path)
+                self.record(path, digest, False)
+            else:
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, path)
+                self.record(path, digest, True)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def write(self, path: str, content: str) -> None:
+        minifier = self.minifier(path)
+        if minifier is not None:
+            content = minifier(content)
+        with self.open_raw(path) as file:
+            file.write(content)
+
+    def note(self, path: str) -> None:
+        recorded = self.recorded(path)
+        if recorded is not None:
+            self.record(path, recorded, False)
+        else:
+            self.record(path, hash_file(path), True)
+
+    def prune(self) -> List[str]:
+        # Removes the outputs of an earlier build that this one did not
+        # produce again. A file replaced since it was written (a static copy
+        # over a minified asset, say) is no longer ours and is left alone.
+        removed: List[str] = []
+        for path in sorted(self.digests.keys() - self.seen):
+            try:
+                if self.recorded(path) is not None:
+                    os.remove(path)
+                    removed.append(path)
+            except FileNotFoundError:
+                pass
+            del self.digests[path]
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        return {"written": self.written, "skipped": self.skipped}
+
+    def save(self) -> None:
+        if self.digests_file is not None:
+            save_manifest({"outputs": self.digests}, self.digests_file)
+
+
+_writer = OutputWriter()
+
+
+def configure_output_writer(
+    digests_file: Optional[str] = None, minify: bool = False
+) -> OutputWriter:
+    global _writer
+    _writer = OutputWriter(digests_file, minify)
+    return _writer
+
+
+def active_output_writer() -> OutputWriter:
+    return _writer